@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Pipeline Benchmark - latency, throughput and memory of core.search,
+search_stack, search_batch and generate_design_system on synthetic data.
+
+For every size, synthetic CSVs with the CSV_CONFIG (and stack) schemas are
+written to a temp directory; cell text is sampled from the words of the real
+CSV column, so queries and term statistics look like the shipped data.
+core.DATA_DIR / INDEX_DIR are pointed at that directory for the run.
+
+Ranking equivalence: BM25.score (inverted index), a persisted-and-restored
+BM25, and SparseBM25 (when NumPy/SciPy are installed) are all checked
+against ReferenceBM25, a naive score-every-document implementation.
+
+Usage: python run.py [--sizes 1000,10000,100000] [--queries 200] [--seed 7]
+                     [--output results.json] [--check]
+Output: JSON report; --check exits 1 if any ranking differs from the reference
+"""
+
+import argparse
+import csv
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from math import log
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import core  # noqa: E402
+import design_system  # noqa: E402
+
+
+# ============ CONFIGURATION ============
+REAL_DATA_DIR = core.DATA_DIR
+DEFAULT_SIZES = (1000, 10000, 100000)
+BENCH_STACKS = ("react",)
+DESIGN_QUERIES = ("SaaS dashboard", "beauty spa wellness", "fintech crypto app", "minimal portfolio")
+# Scores closer than this count as a tie when comparing float backends
+SCORE_TOLERANCE = 1e-9
+MAX_WORDS_PER_CELL = 40
+
+
+# ============ SYNTHETIC DATA ============
+def _targets(domains=None):
+    """(name, file, search_cols, output_cols) for benchmarked domains and stacks"""
+    targets = [(domain, config["file"], config["search_cols"], config["output_cols"])
+               for domain, config in core.CSV_CONFIG.items() if not domains or domain in domains]
+    targets += [(f"stack:{stack}", core.STACK_CONFIG[stack]["file"],
+                 core._STACK_COLS["search_cols"], core._STACK_COLS["output_cols"]) for stack in BENCH_STACKS]
+    return targets
+
+
+def _column_vocab(file, columns):
+    """Per column: (words seen in the real CSV, mean words per cell)"""
+    filepath = REAL_DATA_DIR / file
+    rows = core._load_csv(filepath) if filepath.exists() else []
+    vocab = {}
+    for col in columns:
+        cells = [(row.get(col) or "").split() for row in rows]
+        words = [word for cell in cells for word in cell] or [col.split()[0].lower()]
+        mean_len = statistics.mean(len(cell) for cell in cells) if cells else 3
+        vocab[col] = (words, max(1, min(MAX_WORDS_PER_CELL, round(mean_len))))
+    return vocab
+
+
+def synthesize(data_dir, rows, seed, domains=None):
+    """Write synthetic CSVs with `rows` rows each. Returns {name: [search documents]}."""
+    rng = random.Random(seed)
+    documents = {}
+    for name, file, search_cols, output_cols in _targets(domains):
+        columns = list(dict.fromkeys(list(output_cols) + list(search_cols)))
+        vocab = _column_vocab(file, columns)
+        filepath = data_dir / file
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        docs = []
+        with open(filepath, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for _ in range(rows):
+                row = {}
+                for col in columns:
+                    words, mean_len = vocab[col]
+                    row[col] = " ".join(rng.choices(words, k=rng.randint(1, 2 * mean_len)))
+                writer.writerow(row)
+                docs.append(" ".join(row[col] for col in search_cols))
+        documents[name] = docs
+
+    reasoning = REAL_DATA_DIR / design_system.REASONING_FILE
+    if reasoning.exists():
+        shutil.copy(reasoning, data_dir / design_system.REASONING_FILE)
+    return documents
+
+
+def make_queries(documents, count, seed):
+    """Queries of 1-4 words drawn from the documents of one target"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(documents).split()
+        queries.append(" ".join(rng.sample(words, min(len(words), rng.randint(1, 4)))))
+    return queries
+
+
+# ============ REFERENCE SCORER ============
+class ReferenceBM25:
+    """
+    Naive BM25: scores every document for every query, no index.
+
+    Shares only the tokenizer with core.BM25; term statistics and the
+    per-document arithmetic are recomputed here, in the same order, so the
+    pure-Python backends must match it exactly.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75, tokenizer=None):
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or core.TOKENIZER
+        self.term_freqs = [Counter(self.tokenizer.analyze(doc)) for doc in documents]
+        self.doc_lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.N = len(documents)
+        self.avgdl = sum(self.doc_lengths) / self.N if self.N else 0
+        doc_freqs = Counter(word for tf in self.term_freqs for word in tf)
+        self.idf = {word: log((self.N - df + 0.5) / (df + 0.5) + 1) for word, df in doc_freqs.items()}
+
+    def score(self, query, top_k=None):
+        tokens = self.tokenizer(query)
+        scores = []
+        for idx, term_freqs in enumerate(self.term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[idx] / self.avgdl)
+            score = 0.0
+            for token in tokens:
+                tf = term_freqs.get(token, 0)
+                if tf and token in self.idf:
+                    score += self.idf[token] * (tf * (self.k1 + 1)) / (tf + norm)
+            if score > 0:
+                scores.append((idx, score))
+        scores.sort(key=lambda x: (-x[1], x[0]))
+        return scores if top_k is None else scores[:top_k]
+
+
+def _same_ranking(expected, actual, tolerance=0.0):
+    """Same length and, position by position, same document (or a tie within tolerance)"""
+    if len(expected) != len(actual):
+        return False
+    for (exp_idx, exp_score), (act_idx, act_score) in zip(expected, actual):
+        if abs(exp_score - act_score) > tolerance:
+            return False
+        if exp_idx != act_idx and tolerance == 0.0:
+            return False
+    return True
+
+
+def check_equivalence(documents, queries, top_k):
+    """Count queries whose ranking differs from ReferenceBM25, per backend"""
+    reference = ReferenceBM25(documents)
+    bm25 = core.BM25()
+    bm25.fit(documents)
+    restored = core.BM25.from_dict(json.loads(json.dumps(bm25.to_dict())))
+
+    expected = [reference.score(query, top_k) for query in queries]
+    report = {
+        "queries": len(queries),
+        "inverted_index": sum(not _same_ranking(e, bm25.score(q, top_k)) for e, q in zip(expected, queries)),
+        "persisted": sum(not _same_ranking(e, restored.score(q, top_k)) for e, q in zip(expected, queries))
+    }
+    if core.sparse_available():
+        sparse = core.SparseBM25(bm25).score_batch(queries, top_k)
+        report["sparse"] = sum(not _same_ranking(e, s, SCORE_TOLERANCE) for e, s in zip(expected, sparse))
+    return report
+
+
+# ============ TIMING ============
+def _summary_us(samples):
+    """Mean/p95 of second-based samples, in microseconds"""
+    if not samples:
+        return {"mean": 0.0, "p95": 0.0}
+    samples = sorted(samples)
+    return {"mean": round(statistics.mean(samples) * 1e6, 1),
+            "p95": round(samples[int(len(samples) * 0.95)] * 1e6, 1)}
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _run_search(name, query, max_results):
+    if name.startswith("stack:"):
+        return core.search_stack(query, name.split(":", 1)[1], max_results)
+    return core.search(query, name, max_results)
+
+
+def _clear_results():
+    """Drop cached results but keep fitted indexes in memory"""
+    with core._cache_lock:
+        core._result_cache.clear()
+
+
+def _point_at(data_dir):
+    """Redirect core and design_system to a data directory with its own index"""
+    core.DATA_DIR = data_dir
+    core.INDEX_DIR = data_dir / ".index"
+    design_system.DATA_DIR = data_dir
+    core.clear_cache()
+
+
+def bench_size(data_dir, rows, num_queries, seed, top_k, domains=None):
+    """All measurements for one synthetic corpus size"""
+    documents = synthesize(data_dir, rows, seed, domains)
+    _point_at(data_dir)
+    queries = {name: make_queries(docs, num_queries, seed + i) for i, (name, docs) in enumerate(documents.items())}
+    targets = _targets(domains)
+    result = {"rows": rows, "targets": len(targets)}
+
+    # Parse + fit cost per target, without touching the on-disk index
+    fit = {}
+    for name, file, search_cols, output_cols in targets:
+        start = time.perf_counter()
+        csv_rows = core._load_csv(data_dir / file)
+        parsed = time.perf_counter()
+        docs = [" ".join(str(row.get(col, "")) for col in search_cols) for row in csv_rows]
+        core.BM25().fit(docs)
+        fit[name] = {"parse_ms": round((parsed - start) * 1000, 1),
+                     "fit_ms": round((time.perf_counter() - parsed) * 1000, 1)}
+    result["fit"] = fit
+
+    # Cold: first search builds and writes the index; then first search after a restart reads it back
+    cold_build = {name: _timed(_run_search, name, queries[name][0], top_k) for name, *_ in targets}
+    core.clear_cache()
+    cold_disk = {name: _timed(_run_search, name, queries[name][0], top_k) for name, *_ in targets}
+    result["cold_build_ms"] = {name: round(t * 1000, 1) for name, t in cold_build.items()}
+    result["cold_disk_ms"] = {name: round(t * 1000, 1) for name, t in cold_disk.items()}
+
+    # Warm: indexes in memory; a query's first run misses the result cache, its repeat hits it
+    _clear_results()
+    uncached, cached = [], []
+    for name, *_ in targets:
+        for query in queries[name]:
+            uncached.append(_timed(_run_search, name, query, top_k))
+            cached.append(_timed(_run_search, name, query, top_k))
+    result["warm_uncached_us"] = _summary_us(uncached)
+    result["warm_cached_us"] = _summary_us(cached)
+
+    auto_queries = [query for name, *_ in targets if not name.startswith("stack:") for query in queries[name][:20]]
+    result["unified_build_ms"] = round(_timed(core._get_unified) * 1000, 1)
+    result["auto_route_us"] = _summary_us([_timed(core.search, query, None, top_k) for query in auto_queries])
+
+    # Batch throughput through search_batch, pure Python and (if installed) sparse
+    requests = [{"query": query, "domain": name, "max_results": top_k}
+                for name, *_ in targets if not name.startswith("stack:") for query in queries[name]]
+    batch = {}
+    min_batch = core.SPARSE_MIN_BATCH
+    backends = [("python", float("inf"))] + ([("sparse", min_batch)] if core.sparse_available() else [])
+    for backend, threshold in backends:
+        core.SPARSE_MIN_BATCH = threshold
+        _clear_results()
+        elapsed = _timed(lambda: list(core.search_batch(requests)))
+        batch[backend] = {"queries": len(requests), "seconds": round(elapsed, 3),
+                          "qps": round(len(requests) / elapsed, 1) if elapsed else None}
+    core.SPARSE_MIN_BATCH = min_batch
+    result["batch"] = batch
+
+    # Design system: first call loads reasoning rules and any missing indexes
+    if not domains:
+        design = [_timed(design_system.generate_design_system, query, None, "ascii") for query in DESIGN_QUERIES]
+        result["design_system_ms"] = {"first": round(design[0] * 1000, 1),
+                                      "warm_mean": round(statistics.mean(design[1:]) * 1000, 1)}
+
+    # Memory: peak while building every index from CSV, then while loading them from disk
+    memory = {}
+    for phase, drop_index in (("build", True), ("load", False)):
+        core.clear_cache()
+        if drop_index:
+            shutil.rmtree(core.INDEX_DIR, ignore_errors=True)
+        tracemalloc.start()
+        core.warm_indexes()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory[f"{phase}_peak_mb"] = round(peak / 2 ** 20, 2)
+        memory[f"{phase}_resident_mb"] = round(current / 2 ** 20, 2)
+    result["memory"] = memory
+
+    # Ranking equivalence against the naive reference on the first target
+    name = targets[0][0]
+    result["equivalence"] = {"target": name, **check_equivalence(documents[name], queries[name], top_k)}
+    return result
+
+
+# ============ MAIN ============
+def main():
+    parser = argparse.ArgumentParser(description="Search pipeline benchmark on synthetic CSVs")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated row counts (default: 1000,10000,100000)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per target (default: 200)")
+    parser.add_argument("--max-results", type=int, default=core.MAX_RESULTS, help="top-k per search")
+    parser.add_argument("--domains", help="Comma-separated CSV_CONFIG domains (default: all)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any backend ranking differs")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    domains = [domain.strip() for domain in args.domains.split(",")] if args.domains else None
+    unknown = [domain for domain in domains or () if domain not in core.CSV_CONFIG]
+    if unknown:
+        parser.error(f"Unknown domain(s): {', '.join(unknown)}")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sparse_available": core.sparse_available(),
+        "seed": args.seed,
+        "max_results": args.max_results,
+        "sizes": {}
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"uupm-bench-{size}-") as tmp:
+            report["sizes"][str(size)] = bench_size(Path(tmp), size, args.queries, args.seed,
+                                                    args.max_results, domains)
+            print(f"{size} rows done", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+    if args.check:
+        failures = [size for size, result in report["sizes"].items()
+                    if any(result["equivalence"].get(backend) for backend in ("inverted_index", "persisted", "sparse"))]
+        if failures:
+            print(f"Ranking mismatch at sizes: {', '.join(failures)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup Benchmark - cold-start import cost of the search.py CLI, measured
+with `python -X importtime`.
+
+Each scenario runs the real CLI in a fresh interpreter. Indexes are built
+and scripts/ is byte-compiled up front, so neither index builds nor stale
+.pyc files are counted. Import time is the total of every module imported
+after interpreter startup (the `-c pass` baseline is subtracted).
+
+Absolute import times move with the machine, so budgets are multiples of
+the bare interpreter's own import time (`python -c pass`). Every run times
+the baseline right before the scenario, and a scenario's ratio is the
+median of those per-run ratios, so load on the machine cancels out.
+
+--check fails if a scenario's median ratio exceeds its budget, or if it
+imports a module its mode should never load (plain searches never load
+design_system, bulk-only or persistence-only modules).
+
+Usage: python startup.py [--runs 7] [--check]
+Output: JSON with median import/wall time and the heaviest imports per scenario
+"""
+
+import argparse
+import compileall
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import core  # noqa: E402
+
+# ============ CONFIGURATION ============
+# name -> (search.py arguments, import budget as a multiple of the `-c pass`
+# baseline, modules that must not be imported). Before lazy imports every
+# scenario measured 6.1-6.7x; with them, 3.6-3.9x for searches and 4.0-4.2x
+# for --design-system.
+SCENARIOS = {
+    "search": (["glassmorphism", "--domain", "style"], 5.0,
+               ("design_system", "concurrent.futures", "csv", "hashlib", "datetime")),
+    "search-auto": (["dark dashboard"], 5.0,
+                    ("design_system", "concurrent.futures", "csv", "hashlib", "datetime")),
+    "design-system": (["SaaS dashboard", "--design-system"], 5.5,
+                      ("hashlib", "datetime"))
+}
+TOP_IMPORTS = 8
+
+
+# ============ MEASUREMENT ============
+def _parse_importtime(stderr: str) -> tuple:
+    """(total ms of top-level imports, {module: cumulative ms}) from -X importtime output."""
+    total_us, modules = 0, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        cumulative = int(parts[1])
+        name = parts[2].rstrip()
+        module = name.strip()
+        modules[module] = cumulative / 1000
+        # Nested imports are indented further; only top-level ones add to the total
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += cumulative
+    return total_us / 1000, modules
+
+
+def _run(args: list, cwd: str) -> tuple:
+    """Run one CLI invocation; returns (import ms, {module: ms}, wall ms)."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=cwd,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}: {proc.stderr[-500:]}")
+    total, modules = _parse_importtime(proc.stderr)
+    return total, modules, wall
+
+
+def bench(runs: int) -> dict:
+    compileall.compile_dir(str(SCRIPTS_DIR), quiet=1)
+    core.build_indexes()
+
+    report, baselines = {}, []
+    with tempfile.TemporaryDirectory(prefix="uupm-startup-") as cwd:
+        for name, (args, budget, forbidden) in SCENARIOS.items():
+            samples, ratios = [], []
+            for _ in range(runs):
+                # Interleave so each ratio compares runs under the same load
+                base = _run(["-c", "pass"], cwd)[0]
+                sample = _run([str(SCRIPTS_DIR / "search.py")] + args, cwd)
+                baselines.append(base)
+                samples.append(sample)
+                ratios.append((sample[0] - base) / base if base else 0.0)
+            modules = samples[-1][1]
+            heaviest = sorted(modules.items(), key=lambda item: -item[1])[:TOP_IMPORTS]
+            baseline = statistics.median(baselines[-runs:])
+            report[name] = {
+                "args": args,
+                "import_ms": round(statistics.median(total for total, _, _ in samples) - baseline, 2),
+                "import_ratio": round(statistics.median(ratios), 2),
+                "wall_ms": round(statistics.median(wall for _, _, wall in samples), 2),
+                "budget_ratio": budget,
+                "modules": len(modules),
+                "forbidden_imported": [module for module in forbidden if module in modules],
+                "heaviest": {module: round(ms, 2) for module, ms in heaviest}
+            }
+    report["baseline_ms"] = round(statistics.median(baselines), 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="search.py cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters per scenario (default: 7)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if a scenario exceeds its import ratio budget or imports a forbidden module")
+    args = parser.parse_args()
+
+    report = bench(max(1, args.runs))
+    print(json.dumps(report, indent=2))
+
+    if args.check:
+        failures = [name for name in SCENARIOS
+                    if report[name]["import_ratio"] > report[name]["budget_ratio"] or report[name]["forbidden_imported"]]
+        if failures:
+            print(f"Startup regression in: {', '.join(failures)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenizer Recall Benchmark - compares the default analysis pipeline against
+the legacy analyzer (words longer than 2 chars, no stopwords or stemming).
+
+Labelled queries are derived from the shipped CSVs: for every row, its name
+column (the first output column, e.g. "Style Category") is queried as-is and
+with singular/plural forms flipped. A query is a hit if its source row ranks
+in the top-k.
+
+Latency is reported twice: scoring alone, and the full lookup (scoring plus
+hydrating the top-k rows), which is what search() callers actually wait on.
+The legacy analyzer finds nothing for about a third of the queries, while
+the default pipeline returns rows for nearly all of them, so over all
+queries it does more work per lookup. --check therefore holds the lookup
+latency on the queries both pipelines answer to LATENCY_TOLERANCE, and the
+ratio over all queries to the looser OVERALL_LATENCY_TOLERANCE.
+
+Microsecond means drift by 10-30% between runs, so a single ratio says
+little. The two pipelines are measured in interleaved trials (alternating
+which goes first), each trial fitting fresh indexes for a few rounds and
+keeping every query's fastest round. --check compares the median of the
+per-trial default/legacy ratios; the report also shows their range.
+
+Usage: python tokenizer_recall.py [--k 3] [--trials 7] [--rounds 3] [--check]
+Output: JSON with recall@k, query latency and fit time per tokenizer
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import core  # noqa: E402
+
+# --check fails if, on queries both pipelines answer, the median per-trial
+# ratio of default to legacy mean lookup latency exceeds this factor. On an
+# unchanged tree the median fell in 1.00-1.05 over repeated runs, while
+# single trials spanned 0.69-1.39.
+LATENCY_TOLERANCE = 1.15
+# ... and over all queries, where it also answers the ones legacy misses
+# (median 1.06-1.12 over the same runs)
+OVERALL_LATENCY_TOLERANCE = 1.25
+
+
+def _flip_number(word):
+    """Toggle a word between singular and plural ("animation" <-> "animations")."""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("s"):
+        return word[:-1]
+    if word.endswith("y"):
+        return word[:-1] + "ies"
+    return word + "s"
+
+
+def labelled_queries():
+    """Yield (domain, row index, query) for every named row in every domain CSV."""
+    for domain, config in core.CSV_CONFIG.items():
+        filepath = core.DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        name_col = config["output_cols"][0]
+        for idx, row in enumerate(core._load_csv(filepath)):
+            name = (row.get(name_col) or "").strip()
+            if not name:
+                continue
+            yield domain, idx, name
+            flipped = " ".join(_flip_number(word) for word in name.split())
+            if flipped != name:
+                yield domain, idx, flipped
+
+
+def _fit(tokenizer):
+    """{domain: (bm25, store, output_cols)} for every domain CSV, and the total fit time in ms."""
+    indexes, fit_ms = {}, 0.0
+    for domain, config in core.CSV_CONFIG.items():
+        filepath = core.DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        rows = core._load_csv(filepath)
+        documents = [" ".join(str(row.get(col, "")) for col in config["search_cols"]) for row in rows]
+        bm25 = core.BM25(tokenizer=tokenizer)
+        start = time.perf_counter()
+        bm25.fit(documents)
+        fit_ms += (time.perf_counter() - start) * 1000
+        indexes[domain] = (bm25, core.ColumnStore.from_rows(rows, config["output_cols"]), config["output_cols"])
+    return indexes, fit_ms
+
+
+def evaluate(make_tokenizer, queries, k, rounds=1):
+    """
+    Fit every domain with a tokenizer and measure recall@k and latency.
+
+    Each round starts from a fresh tokenizer and index, so no round sees
+    caches warmed by another; a query's latency is its fastest round.
+    """
+    answered = [False] * len(queries)
+    score_us = [float("inf")] * len(queries)
+    lookup_us = [float("inf")] * len(queries)
+    fit_ms = float("inf")
+    for _ in range(rounds):
+        tokenizer = make_tokenizer()
+        indexes, fit = _fit(tokenizer)
+        fit_ms = min(fit_ms, fit)
+        hits = 0
+        for i, (domain, target, query) in enumerate(queries):
+            bm25, store, output_cols = indexes[domain]
+            start = time.perf_counter()
+            ranked = bm25.score(query, k)
+            scored = time.perf_counter()
+            core._hydrate(store, ranked, output_cols)
+            done = time.perf_counter()
+            score_us[i] = min(score_us[i], (scored - start) * 1e6)
+            lookup_us[i] = min(lookup_us[i], (done - start) * 1e6)
+            answered[i] = any(score > 0 for _, score in ranked)
+            if any(idx == target for idx, _ in ranked):
+                hits += 1
+
+    return {
+        "signature": tokenizer.signature(),
+        "recall_at_k": round(hits / len(queries), 4) if queries else 0.0,
+        "hits": hits,
+        "queries": len(queries),
+        "score_us": _summary(score_us),
+        "lookup_us": _summary(lookup_us),
+        "fit_ms": round(fit_ms, 2),
+        "answered": answered,
+        "lookup_samples": lookup_us
+    }
+
+
+def _summary(samples):
+    """Mean and p95 of a list of microsecond timings."""
+    if not samples:
+        return {"mean": 0.0, "p95": 0.0}
+    samples = sorted(samples)
+    return {"mean": round(statistics.mean(samples), 2), "p95": round(samples[int(len(samples) * 0.95)], 2)}
+
+
+def _ratio(new, old):
+    return round(new["mean"] / old["mean"], 3) if old["mean"] else None
+
+
+def _trial_ratios(legacy, default):
+    """(ratio on queries both answer, ratio over all queries) of mean lookup latency for one trial."""
+    both = [i for i, (a, b) in enumerate(zip(legacy["answered"], default["answered"])) if a and b]
+    answered = _ratio(_summary([default["lookup_samples"][i] for i in both]),
+                      _summary([legacy["lookup_samples"][i] for i in both]))
+    return answered, _ratio(default["lookup_us"], legacy["lookup_us"])
+
+
+def _spread(ratios):
+    """Median and range of per-trial ratios."""
+    ratios = [ratio for ratio in ratios if ratio is not None]
+    if not ratios:
+        return {"median": None, "min": None, "max": None}
+    return {"median": round(statistics.median(ratios), 3), "min": min(ratios), "max": max(ratios)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokenizer recall/latency benchmark")
+    parser.add_argument("--k", type=int, default=3, help="Cutoff for recall@k (default: 3)")
+    parser.add_argument("--trials", type=int, default=7,
+                        help="Interleaved legacy/default trials (default: 7)")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Fresh-index rounds per tokenizer per trial (default: 3)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if recall drops or latency regresses past the tolerance")
+    args = parser.parse_args()
+
+    queries = list(labelled_queries())
+    rounds = max(1, args.rounds)
+    pipelines = {
+        "legacy": lambda: core.Tokenizer(min_length=3, stopwords=(), stem=False),
+        "default": core.Tokenizer
+    }
+    trials = []
+    for trial in range(max(1, args.trials)):
+        # Alternate which pipeline runs first so neither always gets the warmer machine
+        order = ("legacy", "default") if trial % 2 == 0 else ("default", "legacy")
+        results = {name: evaluate(pipelines[name], queries, args.k, rounds) for name in order}
+        trials.append(results)
+
+    answered_ratios, overall_ratios = zip(*(_trial_ratios(t["legacy"], t["default"]) for t in trials))
+    # Recall is deterministic; latency summaries come from the median trial
+    median_trial = sorted(trials, key=lambda t: _trial_ratios(t["legacy"], t["default"])[1] or 0)[len(trials) // 2]
+    legacy, default = median_trial["legacy"], median_trial["default"]
+    both = sum(1 for a, b in zip(legacy["answered"], default["answered"]) if a and b)
+    for result in (legacy, default):
+        del result["answered"], result["lookup_samples"]
+
+    report = {
+        "k": args.k,
+        "trials": len(trials),
+        "legacy": legacy,
+        "default": default,
+        "recall_delta": round(default["recall_at_k"] - legacy["recall_at_k"], 4),
+        "score_latency_ratio": _ratio(default["score_us"], legacy["score_us"]),
+        "answered_by_both": both,
+        "answered_lookup_latency_ratio": _spread(answered_ratios),
+        "lookup_latency_ratio": _spread(overall_ratios)
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.check:
+        if report["recall_delta"] < 0:
+            sys.exit(1)
+        for key, tolerance in (("answered_lookup_latency_ratio", LATENCY_TOLERANCE),
+                               ("lookup_latency_ratio", OVERALL_LATENCY_TOLERANCE)):
+            median = report[key]["median"]
+            if median and median > tolerance:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
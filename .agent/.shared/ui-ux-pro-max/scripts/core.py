@@ -4,15 +4,33 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
-import csv
+import heapq
+import json
+import os
 import re
+import sys
+import threading
+import zlib
+from array import array
+from functools import lru_cache, partial
+from operator import itemgetter
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+
+from profiler import staged
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
+INDEX_DIR = Path(__file__).parent.parent / ".index"
+INDEX_VERSION = 5
 MAX_RESULTS = 3
+RESULT_CACHE_SIZE = 512
+# Hydrated rows memoized per ColumnStore
+ROW_CACHE_SIZE = 1024
+# Batches with at least this many queries per CSV use the sparse backend when available
+SPARSE_MIN_BATCH = 8
+SPARSE_CHUNK = 256
 
 CSV_CONFIG = {
     "style": {
@@ -95,123 +113,872 @@ _STACK_COLS = {
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+# Domain hint keywords; they only boost the unified-index score of their domain
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "prompt": ["prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+DOMAIN_KEYWORD_BOOST = 1.0
+UNIFIED_INDEX_NAME = "_unified.json"
+
+
+# ============ TOKENIZER ============
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how if in into is it its of on or our so than that the
+their then there these this those to was were what when where which while who why will with you your
+""".split())
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+
+
+class Tokenizer:
+    """
+    Text analysis pipeline: lowercase -> split on non-word chars -> length and
+    stopword filter -> light suffix stemmer -> optional bigrams.
+
+    Each stage is a method, so variants can subclass and override one step.
+    Keeping 2-character tokens lets "UI", "UX", "AI" and "3D" match.
+    """
+
+    def __init__(self, min_length=2, stopwords=STOPWORDS, stem=True, bigrams=False, cache_size=4096):
+        self.min_length = min_length
+        self.stopwords = frozenset(stopwords)
+        self.stem_enabled = stem
+        self.bigrams = bigrams
+        # Queries repeat a lot; documents go through analyze() uncached
+        self._cached = lru_cache(maxsize=cache_size)(lambda text: tuple(self.analyze(text)))
+        # The vocabulary is small, so keep() + stem() are memoized per word
+        self._word_cached = lru_cache(maxsize=65536)(self._word)
+
+    def signature(self):
+        """Identifies the analysis settings; indexes built with another signature are rebuilt"""
+        # crc32 rather than hashlib: this runs on every index load and hashlib is slow to import
+        stopwords = f"{zlib.crc32(' '.join(sorted(self.stopwords)).encode('utf-8')):08x}"
+        return f"{type(self).__name__}:min{self.min_length}:sw{stopwords}:stem{int(self.stem_enabled)}:bi{int(self.bigrams)}"
+
+    def split(self, text):
+        return _NON_WORD_RE.sub(' ', str(text).lower()).split()
+
+    def keep(self, word):
+        return len(word) >= self.min_length and word not in self.stopwords
+
+    def stem(self, word):
+        """Plural-only S-stemmer: categories -> category, animations -> animation"""
+        if len(word) <= 3 or word[-1] != "s":
+            return word
+        if word.endswith("ies") and len(word) > 4:
+            return word[:-3] + "y"
+        if word.endswith(("ss", "us", "is", "ous")):
+            return word
+        if word.endswith(("sses", "xes", "ches", "shes", "zes")):
+            return word[:-2]
+        return word[:-1]
+
+    def _word(self, word):
+        """The token for one split word, or None if keep() drops it"""
+        if not self.keep(word):
+            return None
+        return self.stem(word) if self.stem_enabled else word
+
+    def analyze(self, text):
+        # Split words never come back empty, so None is the only falsy token
+        tokens = list(filter(None, map(self._word_cached, self.split(text))))
+        if self.bigrams:
+            tokens += [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens
+
+    def __call__(self, text):
+        return list(self._cached(str(text)))
+
+
+# Pipeline used by every index unless a BM25 is given its own
+TOKENIZER = Tokenizer()
+# The original analyzer (words longer than 2 chars, no stopwords/stemming), for comparisons
+LEGACY_TOKENIZER = Tokenizer(min_length=3, stopwords=(), stem=False)
+
 
 # ============ BM25 IMPLEMENTATION ============
+def _pairs(flat):
+    """Iterate an interleaved a0, b0, a1, b1, ... sequence as (a, b) pairs"""
+    it = iter(flat)
+    return zip(it, it)
+
+
 class BM25:
     """BM25 ranking algorithm for text search"""
 
-    def __init__(self, k1=1.5, b=0.75):
+    # Above this many matching documents, top-k selection uses a heap instead of a full sort
+    SORT_MAX_CANDIDATES = 512
+
+    def __init__(self, k1=1.5, b=0.75, tokenizer=None):
         self.k1 = k1
         self.b = b
-        self.corpus = []
+        self.tokenizer = tokenizer or TOKENIZER
         self.doc_lengths = []
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
+        self.postings = {}
         self.N = 0
+        self._norms = []
+        # token -> [(idx, impact)] in doc order / best first, filled on first use
+        self._impacts = {}
+        self._rankings = {}
+        self._sparse_scorer = None
 
     def tokenize(self, text):
-        """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        """Analyze text with this index's tokenizer pipeline"""
+        return self.tokenizer(text)
 
+    @staged("bm25.fit")
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        corpus = [self.tokenizer.analyze(doc) for doc in documents]
+        self.N = len(corpus)
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
+        self.doc_lengths = [len(doc) for doc in corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
+        # Inverted index: token -> array('I') of interleaved doc_id, tf pairs in doc_id order
+        postings = defaultdict(lambda: array('I'))
+        for idx, doc in enumerate(corpus):
+            term_freqs = defaultdict(int)
             for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+                term_freqs[word] += 1
+            for word, tf in term_freqs.items():
+                postings[word].extend((idx, tf))
+        self.postings = dict(postings)
+
+        for word, doc_postings in self.postings.items():
+            self.doc_freqs[word] = len(doc_postings) // 2
 
         for word, freq in self.doc_freqs.items():
             self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        self._compute_norms()
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+    def _compute_norms(self):
+        """Per-document length normalization term of the BM25 denominator"""
+        self._norms = [self.k1 * (1 - self.b + self.b * doc_len / self.avgdl) for doc_len in self.doc_lengths]
+        self._impacts, self._rankings = {}, {}
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+    def _term_impacts(self, token):
+        """(doc id, score contribution) of every document containing token, in doc order"""
+        impacts = self._impacts.get(token)
+        if impacts is None:
+            doc_postings = self.postings.get(token)
+            if not doc_postings:
+                return ()
+            idf = self.idf[token]
+            norms = self._norms
+            numerator_factor = self.k1 + 1
+            impacts = self._impacts[token] = [(idx, idf * (tf * numerator_factor) / (tf + norms[idx]))
+                                              for idx, tf in _pairs(doc_postings)]
+        return impacts
 
-            scores.append((idx, score))
+    def _term_ranking(self, token):
+        """_term_impacts(token) best first, ties in doc order"""
+        ranking = self._rankings.get(token)
+        if ranking is None:
+            impacts = self._term_impacts(token)
+            if not impacts:
+                return ()
+            # Stable, so reverse=True keeps ties in doc order
+            ranking = self._rankings[token] = sorted(impacts, key=itemgetter(1), reverse=True)
+        return ranking
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    @staged("bm25.score")
+    def score(self, query, top_k=None):
+        """
+        Score documents against query, best first.
 
+        Only documents sharing at least one token with the query are scored
+        (all others score 0). Ties keep document order. Per-token score
+        contributions are computed once, so single-token queries are a slice
+        of that token's ranking.
+        """
+        tokens = self.tokenize(query)
+        if len(tokens) == 1:
+            ranking = self._rankings.get(tokens[0]) or self._term_ranking(tokens[0])
+            return ranking[:top_k] if ranking else []
 
-# ============ SEARCH FUNCTIONS ============
+        scores = None
+        cached = self._impacts
+        for token in tokens:
+            impacts = cached.get(token) or self._term_impacts(token)
+            if not impacts:
+                continue
+            if scores is None:
+                # The first matching token seeds the scores; 0.0 + impact == impact
+                scores = dict(impacts)
+                get = scores.get
+                continue
+            for idx, impact in impacts:
+                scores[idx] = get(idx, 0.0) + impact
+        if not scores:
+            return []
+
+        if top_k is not None and len(scores) > self.SORT_MAX_CANDIDATES:
+            return heapq.nlargest(top_k, scores.items(), key=lambda x: (x[1], -x[0]))
+        # Stable sort of ascending doc ids keeps ties in document order
+        ranked = sorted(scores)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        return [(idx, scores[idx]) for idx in ranked[:top_k]]
+
+    def score_batch(self, queries, top_k=None):
+        """Pure-Python counterpart of SparseBM25.score_batch"""
+        return [self.score(query, top_k) for query in queries]
+
+    def to_dict(self):
+        """Serialize fitted state for the on-disk index"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "tokenizer": self.tokenizer.signature(),
+            "doc_lengths": self.doc_lengths,
+            "avgdl": self.avgdl,
+            "idf": self.idf,
+            "postings": {word: list(doc_postings) for word, doc_postings in self.postings.items()},
+            "N": self.N
+        }
+
+    @classmethod
+    def from_dict(cls, state, tokenizer=None):
+        """Restore a fitted instance without re-tokenizing the corpus"""
+        bm25 = cls(state["k1"], state["b"], tokenizer)
+        if state.get("tokenizer") != bm25.tokenizer.signature():
+            raise ValueError("Index was built with a different tokenizer")
+        bm25.doc_lengths = state["doc_lengths"]
+        bm25.avgdl = state["avgdl"]
+        bm25.idf = state["idf"]
+        bm25.postings = {word: array('I', p) for word, p in state["postings"].items()}
+        bm25.doc_freqs = defaultdict(int, {word: len(p) // 2 for word, p in bm25.postings.items()})
+        bm25.N = state["N"]
+        if bm25.N:
+            bm25._compute_norms()
+        return bm25
+
+
+# ============ SPARSE BACKEND (optional) ============
+_sparse_modules = None
+
+
+def _sparse_backend():
+    """Return (numpy, scipy.sparse), or None when they are not installed. Imported lazily."""
+    global _sparse_modules
+    if _sparse_modules is None:
+        try:
+            import numpy
+            from scipy import sparse
+            _sparse_modules = (numpy, sparse)
+        except ImportError:
+            _sparse_modules = False
+    return _sparse_modules or None
+
+
+def sparse_available():
+    """True if NumPy and SciPy are importable"""
+    return _sparse_backend() is not None
+
+
+class SparseBM25:
+    """
+    Vectorized BM25 over a CSR document-term matrix of precomputed term weights.
+
+    Built from a fitted BM25; a batch of queries is scored as one sparse
+    matrix product. Rankings match BM25.score within floating-point tolerance.
+    """
+
+    # Scores are rounded to this many decimals before ordering, so exact ties
+    # in the pure-Python path stay ties here and fall back to document order
+    TIE_DECIMALS = 10
+
+    def __init__(self, bm25):
+        backend = _sparse_backend()
+        if backend is None:
+            raise ImportError("SparseBM25 requires numpy and scipy")
+        self.np, sparse = backend
+        self.bm25 = bm25
+        self.vocab = {token: col for col, token in enumerate(bm25.postings)}
+
+        rows, cols, weights = [], [], []
+        numerator_factor = bm25.k1 + 1
+        for token, col in self.vocab.items():
+            idf = bm25.idf[token]
+            for idx, tf in _pairs(bm25.postings[token]):
+                rows.append(idx)
+                cols.append(col)
+                weights.append(idf * (tf * numerator_factor) / (tf + bm25._norms[idx]))
+
+        self._sparse = sparse
+        self.matrix = sparse.csr_matrix(
+            (self.np.asarray(weights, dtype=self.np.float64), (rows, cols)),
+            shape=(bm25.N, len(self.vocab))
+        )
+
+    @staged("bm25.score_batch")
+    def score_batch(self, queries, top_k=None):
+        """Score many queries in one product; returns one ranked [(idx, score)] list per query."""
+        np = self.np
+        rows, cols = [], []
+        for col, query in enumerate(queries):
+            for token in self.bm25.tokenize(query):
+                row = self.vocab.get(token)
+                if row is not None:
+                    rows.append(row)
+                    cols.append(col)
+
+        # Term-query count matrix; duplicate (term, query) entries are summed
+        query_matrix = self._sparse.csc_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(self.vocab), len(queries))
+        )
+        scores = (self.matrix @ query_matrix).tocsc()
+
+        ranked = []
+        for col in range(len(queries)):
+            start, end = scores.indptr[col], scores.indptr[col + 1]
+            doc_ids = scores.indices[start:end]
+            values = scores.data[start:end]
+            keep = values > 0
+            doc_ids, values = doc_ids[keep], values[keep]
+            order = np.lexsort((doc_ids, -np.round(values, self.TIE_DECIMALS)))
+            if top_k is not None:
+                order = order[:top_k]
+            ranked.append([(int(doc_ids[i]), float(values[i])) for i in order])
+        return ranked
+
+
+# ============ CSV LOADING ============
+@staged("csv.parse")
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
+    # Only index builds parse CSVs, so warm lookups never import csv
+    import csv
     with open(filepath, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
+class ColumnStore:
+    """
+    Column-wise storage for CSV rows.
+
+    Each column is a single string blob plus an array('I') of offsets, so a
+    warm process holds a few large strings instead of a dict per row. Rows
+    are hydrated into dicts only for returned results.
+    """
+
+    def __init__(self, columns, blobs, offsets, nulls=None):
+        self.columns = tuple(sys.intern(col) for col in columns)
+        self._blobs = dict(zip(self.columns, blobs))
+        self._offsets = dict(zip(self.columns, offsets))
+        # Short CSV rows leave None in DictReader output; keep them distinct from ""
+        self._nulls = {col: frozenset(idx) for col, idx in (nulls or {}).items() if idx}
+        self._len = len(offsets[0]) - 1 if offsets else 0
+        # Results keep returning the same rows, so hydrated rows are memoized per column set
+        self._row_caches = {}
+
+    @classmethod
+    def from_rows(cls, rows, columns):
+        """Build from DictReader rows, keeping only the given columns that exist"""
+        header = rows[0].keys() if rows else ()
+        columns = [col for col in columns if col in header]
+        blobs, offsets, nulls = [], [], {}
+        for col in columns:
+            parts, ends, missing, pos = [], array('I', [0]), [], 0
+            for idx, row in enumerate(rows):
+                value = row.get(col)
+                if value is None:
+                    missing.append(idx)
+                    value = ""
+                parts.append(value)
+                pos += len(value)
+                ends.append(pos)
+            blobs.append("".join(parts))
+            offsets.append(ends)
+            nulls[col] = missing
+        return cls(columns, blobs, offsets, nulls)
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, col):
+        return col in self._blobs
+
+    def value(self, idx, col):
+        """Single cell; None for cells missing from short CSV rows"""
+        if idx in self._nulls.get(col, ()):
+            return None
+        offsets = self._offsets[col]
+        return self._blobs[col][offsets[idx]:offsets[idx + 1]]
+
+    def _row(self, idx, columns):
+        """Uncached row(); cells missing from short CSV rows come back as None"""
+        blobs, offsets, nulls = self._blobs, self._offsets, self._nulls
+        row = {}
+        for col in columns:
+            blob = blobs.get(col)
+            if blob is not None:
+                ends = offsets[col]
+                row[col] = None if col in nulls and idx in nulls[col] else blob[ends[idx]:ends[idx + 1]]
+        return row
+
+    def _row_cache(self, columns):
+        """Memoized _row(idx) for one column set"""
+        columns = tuple(columns or self.columns)
+        cache = self._row_caches.get(columns)
+        if cache is None:
+            cache = self._row_caches[columns] = lru_cache(maxsize=ROW_CACHE_SIZE)(partial(self._row, columns=columns))
+        return cache
+
+    def row(self, idx, columns=None):
+        """Hydrate one row as a dict of the requested (existing) columns"""
+        # Copied, since callers may modify the returned dict
+        return self._row_cache(columns)(idx).copy()
+
+    def rows(self, ids, columns=None):
+        """row() for each of ids"""
+        cached = self._row_cache(columns)
+        return [cached(idx).copy() for idx in ids]
+
+    def to_dict(self):
+        """Serialize for the on-disk index"""
+        return {
+            "columns": list(self.columns),
+            "blobs": [self._blobs[col] for col in self.columns],
+            "offsets": [list(self._offsets[col]) for col in self.columns],
+            "nulls": {col: sorted(idx) for col, idx in self._nulls.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(state["columns"], state["blobs"], [array('I', o) for o in state["offsets"]], state["nulls"])
+
+
+# ============ PERSISTENT INDEX ============
+def _file_stamp(filepath):
+    """Cheap change detector: (mtime_ns, size)"""
+    stat = filepath.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _file_hash(filepath):
+    """Content hash used when the stamp changed but the bytes may not have"""
+    import hashlib
+    with open(filepath, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _index_path(filepath):
+    """Map a data CSV to its index file (stacks/react.csv -> stacks__react.json)"""
+    try:
+        name = filepath.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        name = filepath.name
+    return INDEX_DIR / (name.replace("/", "__").rsplit(".", 1)[0] + ".json")
+
+
+def _read_index(index_path):
+    """Load an index record, or None if missing/corrupt/outdated"""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(record, dict) or record.get("version") != INDEX_VERSION:
+        return None
+    # Tokenized corpora are only valid for the pipeline that produced them
+    if record.get("bm25", {}).get("tokenizer") != TOKENIZER.signature():
+        return None
+    return record
+
+
+def _write_index(index_path, record):
+    """Atomically write an index record; a read-only tree just skips caching"""
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+
+def _build_index(filepath, search_cols, output_cols):
+    """Parse the CSV, fit BM25 over its search columns and keep only output columns"""
+    rows = _load_csv(filepath)
+    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in rows]
+    bm25 = BM25()
+    bm25.fit(documents)
+    return ColumnStore.from_rows(rows, output_cols), bm25
+
+
+@staged("index.load")
+def _load_index(filepath, search_cols, output_cols, rebuild=False):
+    """
+    Return (ColumnStore of output columns, fitted BM25) for a CSV.
+
+    The compiled index is reused while the CSV's mtime/size match; if only the
+    stamp changed, the content hash decides whether a rebuild is needed.
+    """
+    index_path = _index_path(filepath)
+    mtime_ns, size = _file_stamp(filepath)
+    sha1 = None
+
+    record = None if rebuild else _read_index(index_path)
+    if record and record.get("search_cols") == list(search_cols) and record.get("output_cols") == list(output_cols):
+        if (record.get("mtime_ns"), record.get("size")) == (mtime_ns, size):
+            return ColumnStore.from_dict(record["store"]), BM25.from_dict(record["bm25"])
+        sha1 = _file_hash(filepath)
+        if record.get("sha1") == sha1:
+            # Touched but unchanged: refresh the stamp, keep the index
+            record["mtime_ns"], record["size"] = mtime_ns, size
+            _write_index(index_path, record)
+            return ColumnStore.from_dict(record["store"]), BM25.from_dict(record["bm25"])
+
+    store, bm25 = _build_index(filepath, search_cols, output_cols)
+    _write_index(index_path, {
+        "version": INDEX_VERSION,
+        "source": filepath.name,
+        "search_cols": list(search_cols),
+        "output_cols": list(output_cols),
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha1": sha1 or _file_hash(filepath),
+        "store": store.to_dict(),
+        "bm25": bm25.to_dict()
+    })
+    return store, bm25
+
+
+def _index_targets():
+    """(file, search_cols, output_cols) for every domain and stack CSV"""
+    targets = [(config["file"], config["search_cols"], config["output_cols"]) for config in CSV_CONFIG.values()]
+    targets += [(config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"]) for config in STACK_CONFIG.values()]
+    return targets
+
+
+def build_indexes(force=False):
+    """Build (or refresh) the index of every domain and stack CSV. Returns indexed files."""
+    if force:
+        clear_cache()
+
+    indexed = []
+    for file, search_cols, output_cols in _index_targets():
+        filepath = DATA_DIR / file
+        if filepath.exists():
+            _load_index(filepath, search_cols, output_cols, rebuild=force)
+            indexed.append(file)
+    if indexed:
+        _get_unified(rebuild=force)
+    return indexed
+
+
+# ============ IN-PROCESS CACHE ============
+# Fitted indexes per CSV: str(filepath) -> (stamp, ColumnStore, bm25)
+_index_cache = {}
+# LRU of ranked results: (str(filepath), stamp, query tokens, max_results) -> tuple of rows
+_result_cache = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+# Guards the three structures above; index loading itself runs unlocked
+_cache_lock = threading.Lock()
+
+
+def _get_index(filepath, search_cols, output_cols, stamp):
+    """Return (store, bm25) from memory, falling back to the on-disk index"""
+    key = str(filepath)
+    with _cache_lock:
+        cached = _index_cache.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1], cached[2]
+    store, bm25 = _load_index(filepath, search_cols, output_cols)
+    with _cache_lock:
+        _index_cache[key] = (stamp, store, bm25)
+    return store, bm25
+
+
+def domain_rows(domain):
+    """Every row of a domain CSV as search() returns it (output columns), read from its cached index"""
+    config = CSV_CONFIG.get(domain)
+    if config is None:
+        return []
+    filepath = DATA_DIR / config["file"]
     if not filepath.exists():
         return []
+    store, _ = _get_index(filepath, config["search_cols"], config["output_cols"], _file_stamp(filepath))
+    return [store.row(idx, config["output_cols"]) for idx in range(len(store))]
+
+
+def warm_indexes():
+    """Load every domain and stack index into memory. Returns warmed files."""
+    warmed = []
+    for file, search_cols, output_cols in _index_targets():
+        filepath = DATA_DIR / file
+        if filepath.exists():
+            _get_index(filepath, search_cols, output_cols, _file_stamp(filepath))
+            warmed.append(file)
+    _get_unified()
+    return warmed
+
+
+def cache_info():
+    """Hit/miss counters and sizes of the in-process search caches"""
+    with _cache_lock:
+        return {
+            "hits": _cache_stats["hits"],
+            "misses": _cache_stats["misses"],
+            "size": len(_result_cache),
+            "maxsize": RESULT_CACHE_SIZE,
+            "indexes": len(_index_cache)
+        }
+
+
+def clear_cache():
+    """Drop cached results and fitted indexes, and reset counters"""
+    global _unified_cache
+    with _cache_lock:
+        _unified_cache = None
+        _result_cache.clear()
+        _index_cache.clear()
+        _cache_stats["hits"] = 0
+        _cache_stats["misses"] = 0
+
+
+def _cache_get(key):
+    """Copy of cached results for key, or None (counts a hit or miss)"""
+    with _cache_lock:
+        cached = _result_cache.get(key)
+        if cached is None:
+            _cache_stats["misses"] += 1
+            return None
+        _result_cache.move_to_end(key)
+        _cache_stats["hits"] += 1
+    return [dict(row) for row in cached]
+
+
+def _cache_put(key, results):
+    """Store results under key, evicting the least recently used entry"""
+    with _cache_lock:
+        _result_cache[key] = tuple(dict(row) for row in results)
+        if len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
 
-    data = _load_csv(filepath)
+def _get_sparse(bm25):
+    """SparseBM25 for a fitted BM25, built once and kept on the instance"""
+    if bm25._sparse_scorer is None:
+        bm25._sparse_scorer = SparseBM25(bm25)
+    return bm25._sparse_scorer
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
 
-    # BM25 search
+# ============ UNIFIED INDEX ============
+class UnifiedIndex:
+    """
+    One BM25 over every domain and stack CSV; each document remembers its source.
+
+    IDF is shared, but document length is normalized against the average of
+    its own source, so CSVs with long rows (styles, prompts) are not buried
+    under CSVs with short ones.
+    """
+
+    def __init__(self, sources, doc_sources, doc_rows, bm25):
+        self.sources = sources          # [(label, filepath, search_cols, output_cols)]
+        self.doc_sources = doc_sources  # doc id -> index into sources
+        self.doc_rows = doc_rows        # doc id -> row number in that source's CSV
+        self.bm25 = bm25
+        self._normalize_per_source()
+
+    def _normalize_per_source(self):
+        totals = defaultdict(int)
+        counts = defaultdict(int)
+        for idx, source_idx in enumerate(self.doc_sources):
+            totals[source_idx] += self.bm25.doc_lengths[idx]
+            counts[source_idx] += 1
+        avgdl = {source_idx: (totals[source_idx] / counts[source_idx]) or 1 for source_idx in totals}
+
+        bm25 = self.bm25
+        bm25._norms = [bm25.k1 * (1 - bm25.b + bm25.b * doc_len / avgdl[self.doc_sources[idx]])
+                       for idx, doc_len in enumerate(bm25.doc_lengths)]
+        bm25._impacts, bm25._rankings = {}, {}
+
+    def label(self, idx):
+        return self.sources[self.doc_sources[idx]][0]
+
+    def best_scores(self, query):
+        """Best raw BM25 score per source label, from a single scoring pass"""
+        best = {}
+        for idx, score in self.bm25.score(query):
+            label = self.label(idx)
+            if score > best.get(label, 0):
+                best[label] = score
+        return best
+
+
+_unified_cache = None  # (stamps, UnifiedIndex)
+
+
+def _unified_sources():
+    """(label, filepath, search_cols, output_cols) for every existing domain and stack CSV"""
+    sources = [(domain, DATA_DIR / config["file"], config["search_cols"], config["output_cols"])
+               for domain, config in CSV_CONFIG.items()]
+    sources += [(f"stack:{stack}", DATA_DIR / config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+                for stack, config in STACK_CONFIG.items()]
+    return [source for source in sources if source[1].exists()]
+
+
+@staged("index.load_unified")
+def _load_unified(sources, stamps, rebuild=False):
+    """Load the unified index from disk if all source stamps match, else rebuild it"""
+    index_path = INDEX_DIR / UNIFIED_INDEX_NAME
+    labels = [source[0] for source in sources]
+
+    record = None if rebuild else _read_index(index_path)
+    if record and record.get("labels") == labels and record.get("stamps") == stamps:
+        return UnifiedIndex(sources, record["doc_sources"], record["doc_rows"], BM25.from_dict(record["bm25"]))
+
+    documents, doc_sources, doc_rows = [], [], []
+    for source_idx, (label, filepath, search_cols, output_cols) in enumerate(sources):
+        for row_idx, row in enumerate(_load_csv(filepath)):
+            documents.append(" ".join(str(row.get(col, "")) for col in search_cols))
+            doc_sources.append(source_idx)
+            doc_rows.append(row_idx)
     bm25 = BM25()
     bm25.fit(documents)
-    ranked = bm25.score(query)
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+    _write_index(index_path, {
+        "version": INDEX_VERSION,
+        "labels": labels,
+        "stamps": stamps,
+        "doc_sources": doc_sources,
+        "doc_rows": doc_rows,
+        "bm25": bm25.to_dict()
+    })
+    return UnifiedIndex(sources, doc_sources, doc_rows, bm25)
+
+
+def _get_unified(rebuild=False):
+    """Unified index over all CSVs, rebuilt whenever any source CSV changes"""
+    global _unified_cache
+    sources = _unified_sources()
+    if not sources:
+        return None
+    stamps = [list(_file_stamp(source[1])) for source in sources]
+
+    with _cache_lock:
+        cached = _unified_cache
+    if cached and cached[0] == stamps and not rebuild:
+        return cached[1]
+
+    unified = _load_unified(sources, stamps, rebuild)
+    with _cache_lock:
+        _unified_cache = (stamps, unified)
+    return unified
+
+
+def _keyword_hits(query):
+    """Number of DOMAIN_KEYWORDS found in query, per domain"""
+    query_lower = query.lower()
+    return {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in DOMAIN_KEYWORDS.items()}
 
+
+def _boost(hits, label):
+    """Multiplicative keyword boost; keeps the ranking within a domain unchanged"""
+    return 1 + DOMAIN_KEYWORD_BOOST * hits.get(label, 0)
+
+
+# ============ SEARCH FUNCTIONS ============
+@staged("hydrate")
+def _hydrate(store, ranked, output_cols):
+    """Turn ranked (idx, score) pairs into output rows, dropping zero scores"""
+    return store.rows([idx for idx, score in ranked if score > 0], output_cols)
+
+
+@staged("search_csv")
+def _search_csv(filepath, search_cols, output_cols, query, max_results):
+    """Core search function using BM25"""
+    if not filepath.exists():
+        return []
+
+    stamp = _file_stamp(filepath)
+    store, bm25 = _get_index(filepath, search_cols, output_cols, stamp)
+
+    key = (str(filepath), stamp, tuple(bm25.tokenize(query)), max_results)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    results = _hydrate(store, bm25.score(query, max_results), output_cols)
+    _cache_put(key, results)
     return results
 
 
+def _prime_batch(filepath, search_cols, output_cols, items):
+    """
+    Score a group of (query, max_results) against one CSV with a single sparse
+    matrix product and seed the result cache, so the per-query searches that
+    follow are cache hits. No-op without NumPy/SciPy.
+    """
+    if len(items) < SPARSE_MIN_BATCH or not sparse_available() or not filepath.exists():
+        return
+
+    stamp = _file_stamp(filepath)
+    store, bm25 = _get_index(filepath, search_cols, output_cols, stamp)
+    if bm25.N == 0:
+        return
+
+    pending = {}
+    for query, max_results in items:
+        key = (str(filepath), stamp, tuple(bm25.tokenize(query)), max_results)
+        with _cache_lock:
+            if key in _result_cache:
+                continue
+        pending[key] = query
+
+    if pending:
+        top_k = max(key[3] for key in pending)
+        rankings = _get_sparse(bm25).score_batch(list(pending.values()), top_k)
+        for key, ranked in zip(pending, rankings):
+            _cache_put(key, _hydrate(store, ranked[:key[3]], output_cols))
+
+
+@staged("detect_domain")
 def detect_domain(query):
-    """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
+    """
+    Auto-detect the most relevant domain from query.
 
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "prompt": ["prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
+    Each domain is scored by its best hit in the unified index plus a bonus
+    per DOMAIN_KEYWORDS match, each worth as much as the strongest hit in
+    any domain; ties go to the domain with more keyword matches. A domain
+    the query names by keyword is therefore not outranked by a weak match
+    elsewhere just because none of its own documents match. Keyword counts
+    alone decide when no document matches at all.
+    """
+    hits = _keyword_hits(query)
+    unified = _get_unified()
+    best_scores = unified.best_scores(query) if unified else {}
+
+    top = max((best_scores.get(domain, 0) for domain in CSV_CONFIG), default=0)
+    routed = {domain: best_scores.get(domain, 0) + DOMAIN_KEYWORD_BOOST * hits.get(domain, 0) * top
+              for domain in CSV_CONFIG}
+    best = max(routed, key=lambda domain: (routed[domain], hits.get(domain, 0)))
+    if routed[best] > 0:
+        return best
 
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
+    best = max(hits, key=hits.get)
+    return best if hits[best] > 0 else "style"
 
 
 def search(query, domain=None, max_results=MAX_RESULTS):
@@ -256,3 +1023,125 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+
+
+def search_all(query, max_results=MAX_RESULTS, per_domain=False, include_stacks=True):
+    """
+    Search every domain (and stack) in one scoring pass over the unified index.
+
+    Returns the best max_results hits overall, or with per_domain=True the
+    top max_results of each domain under "by_domain". Each row carries its
+    source in a "Domain" field.
+    """
+    unified = _get_unified()
+    if unified is None:
+        return {"error": f"No data files found in {DATA_DIR}", "domain": "all"}
+
+    hits = _keyword_hits(query)
+    ranked = []
+    for idx, score in unified.bm25.score(query):
+        label = unified.label(idx)
+        if include_stacks or not label.startswith("stack:"):
+            ranked.append((score * _boost(hits, label), idx))
+    ranked.sort(key=lambda x: (-x[0], x[1]))
+
+    def hydrate(idx):
+        label, filepath, search_cols, output_cols = unified.sources[unified.doc_sources[idx]]
+        store, _ = _get_index(filepath, search_cols, output_cols, _file_stamp(filepath))
+        return {"Domain": label, **store.row(unified.doc_rows[idx], output_cols)}
+
+    if per_domain:
+        by_domain = {}
+        for score, idx in ranked:
+            rows = by_domain.setdefault(unified.label(idx), [])
+            if len(rows) < max_results:
+                rows.append(idx)
+        by_domain = {label: [hydrate(idx) for idx in ids] for label, ids in by_domain.items()}
+        return {
+            "domain": "all",
+            "query": query,
+            "file": "*",
+            "count": sum(len(rows) for rows in by_domain.values()),
+            "by_domain": by_domain
+        }
+
+    results = [hydrate(idx) for score, idx in ranked[:max_results]]
+    return {
+        "domain": "all",
+        "query": query,
+        "file": "*",
+        "count": len(results),
+        "results": results
+    }
+
+
+def parse_batch_request(request):
+    """
+    (query, domain, stack, max_results) of one search_batch request.
+
+    Raises ValueError naming the first malformed field; unknown domain and
+    stack names are left to search() and search_stack().
+    """
+    if not isinstance(request, dict):
+        raise ValueError("expected a JSON object")
+    for field in ("query", "domain", "stack"):
+        value = request.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{field} must be a string, got {type(value).__name__}")
+
+    max_results = request.get("max_results")
+    if max_results is None:
+        max_results = MAX_RESULTS
+    try:
+        valid = int(max_results) > 0
+    except (TypeError, ValueError, OverflowError):
+        valid = False
+    if not valid:
+        raise ValueError(f"max_results must be a positive integer, got {max_results!r}")
+    return request.get("query") or "", request.get("domain") or None, request.get("stack") or None, int(max_results)
+
+
+def search_batch(requests):
+    """
+    Run many searches, grouped by target CSV so each index is loaded once.
+
+    requests: iterable of dicts with "query" and optional "domain", "stack", "max_results".
+    Yields (position, result) as each group is scored; positions follow input order.
+    A malformed request (see parse_batch_request) yields {"error": ...} for its
+    position without affecting the others.
+    """
+    groups = OrderedDict()
+    for position, request in enumerate(requests):
+        try:
+            query, domain, stack, max_results = parse_batch_request(request)
+        except ValueError as e:
+            yield position, {"error": f"Invalid request: {e}"}
+            continue
+        if stack:
+            key = ("stack", stack)
+        else:
+            key = ("domain", domain or detect_domain(query))
+        groups.setdefault(key, []).append((position, query, max_results))
+
+    for (kind, name), items in groups.items():
+        if kind == "domain" and name == "all":
+            for position, query, max_results in items:
+                yield position, search_all(query, max_results)
+            continue
+        if kind == "stack":
+            filepath = DATA_DIR / STACK_CONFIG[name]["file"] if name in STACK_CONFIG else None
+            search_cols, output_cols = _STACK_COLS["search_cols"], _STACK_COLS["output_cols"]
+        else:
+            config = CSV_CONFIG.get(name, CSV_CONFIG["style"])
+            filepath = DATA_DIR / config["file"]
+            search_cols, output_cols = config["search_cols"], config["output_cols"]
+
+        for start in range(0, len(items), SPARSE_CHUNK):
+            chunk = items[start:start + SPARSE_CHUNK]
+            if filepath is not None:
+                _prime_batch(filepath, search_cols, output_cols, [(query, max_results) for _, query, max_results in chunk])
+            for position, query, max_results in chunk:
+                if kind == "stack":
+                    yield position, search_stack(query, name, max_results)
+                else:
+                    yield position, search(query, name, max_results)
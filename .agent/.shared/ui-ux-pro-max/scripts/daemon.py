@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Daemon - Long-lived search process with warm indexes
+
+Speaks JSON-lines over a Unix socket (or stdin/stdout): one request object
+per line, one response object per line.
+
+Requests:
+    {"op": "search", "query": "glassmorphism", "domain": "style", "max_results": 3}
+    {"op": "search_stack", "query": "forms", "stack": "react", "max_results": 3}
+    {"op": "search_all", "query": "dark dashboard", "max_results": 5, "per_domain": false}
+    {"op": "design_system", "query": "SaaS dashboard", "project_name": "Acme", "format": "ascii",
+     "persist": false, "page": null, "output_dir": "/path/to/project"}
+    {"op": "ping"}
+
+Responses:
+    {"ok": true, "result": ...}
+    {"ok": false, "error": "..."}
+
+Usage:
+    python search.py --serve [--socket /tmp/ui-ux-pro-max.sock]
+    python search.py --serve --stdio
+    python search.py "<query>" --daemon    # falls back to in-process search
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+from pathlib import Path
+
+import core
+
+
+# ============ CONFIGURATION ============
+def _default_socket():
+    """Per-user socket path in the temp directory"""
+    try:
+        user = str(os.getuid())
+    except AttributeError:
+        user = os.environ.get("USERNAME", "user")
+    return Path(tempfile.gettempdir()) / f"ui-ux-pro-max-{user}.sock"
+
+
+DEFAULT_SOCKET = _default_socket()
+CLIENT_TIMEOUT = 30
+
+
+# ============ REQUEST HANDLING ============
+def execute(request: dict):
+    """Run one request in this process and return its result."""
+    op = request.get("op", "search")
+    query = request.get("query", "")
+    max_results = request.get("max_results")
+    max_results = core.MAX_RESULTS if max_results is None else int(max_results)
+    if max_results <= 0:
+        raise ValueError(f"max_results must be a positive integer, got {request.get('max_results')!r}")
+
+    if op == "ping":
+        return {"pid": os.getpid(), "cache": core.cache_info()}
+    if op == "search":
+        return core.search(query, request.get("domain"), max_results)
+    if op == "search_stack":
+        return core.search_stack(query, request.get("stack"), max_results)
+    if op == "search_all":
+        return core.search_all(query, max_results, per_domain=bool(request.get("per_domain")))
+    if op == "design_system":
+        from design_system import generate_design_system
+        return generate_design_system(
+            query,
+            request.get("project_name"),
+            request.get("format", "ascii"),
+            persist=bool(request.get("persist")),
+            page=request.get("page"),
+            output_dir=request.get("output_dir")
+        )
+    raise ValueError(f"Unknown op: {op}")
+
+
+def handle_request(request) -> dict:
+    """Wrap execute() into a protocol response; never raises."""
+    if not isinstance(request, dict):
+        return {"ok": False, "error": "Request must be a JSON object"}
+    try:
+        return {"ok": True, "result": execute(request)}
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def _handle_line(line) -> str:
+    """Decode one request line and encode its response line."""
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        response = {"ok": False, "error": f"Invalid JSON: {e}"}
+    else:
+        response = handle_request(request)
+    return json.dumps(response, ensure_ascii=False) + "\n"
+
+
+# ============ SERVERS ============
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers every line a client sends until it disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(_handle_line(line.decode("utf-8")).encode("utf-8"))
+            self.wfile.flush()
+
+
+def _daemon_alive(socket_path) -> bool:
+    """True if something is already accepting connections on socket_path."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+
+
+def serve_socket(socket_path=None):
+    """Warm all indexes and serve requests on a Unix socket until interrupted."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Unix sockets are not available on this platform; use --stdio")
+
+    socket_path = Path(socket_path or DEFAULT_SOCKET)
+    if socket_path.exists():
+        if _daemon_alive(socket_path):
+            raise OSError(f"Daemon already running on {socket_path}")
+        socket_path.unlink()
+
+    warmed = core.warm_indexes()
+    old_umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(str(socket_path), _RequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+    # Treat SIGTERM like Ctrl+C so the socket file is always cleaned up
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f"ui-ux-pro-max daemon: {len(warmed)} indexes warm, listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except OSError:
+            pass
+
+
+def serve_stdio(stdin=None, stdout=None):
+    """Warm all indexes and answer JSON-lines requests from stdin until EOF."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    core.warm_indexes()
+    for line in stdin:
+        if not line.strip():
+            continue
+        stdout.write(_handle_line(line))
+        stdout.flush()
+
+
+# ============ CLIENT ============
+def _connect(socket_path):
+    """Open a connection to a running daemon; raises OSError if there is none."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CLIENT_TIMEOUT)
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _send(request: dict, sock) -> dict:
+    """Send one request over a connected socket and return the daemon's response."""
+    with sock:
+        sock.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("Daemon closed the connection")
+    return json.loads(line)
+
+
+def query(request: dict, socket_path=None):
+    """
+    Answer a request through the daemon if one is running, otherwise in-process.
+
+    Only a daemon that cannot be connected to falls back to execute(). Once
+    the request is sent the daemon may already be acting on it (persist
+    writes files), so timeouts, dropped connections and unreadable responses
+    are raised as RuntimeError instead of running the request a second time,
+    as are errors reported by the daemon.
+    """
+    socket_path = Path(socket_path or DEFAULT_SOCKET)
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return execute(request)
+    try:
+        sock = _connect(socket_path)
+    except OSError:
+        return execute(request)
+
+    try:
+        response = _send(request, sock)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"Daemon request failed: {e}") from e
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "Daemon error"))
+    return response["result"]
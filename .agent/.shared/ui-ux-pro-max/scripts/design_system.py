@@ -11,14 +11,27 @@ Usage:
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
+
+    # Many briefs at once (shared generator, deduplicated searches, pooled writes)
+    for record in generate_design_systems([{"query": "SaaS dashboard", "pages": ["dashboard"]}]):
+        print(record["timings_ms"])
+
+    # Precompute every products.csv category (queries naming one skip live search)
+    build_snapshots()
 """
 
 import csv
 import json
 import os
-from datetime import datetime
+import re
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter, deque
+from functools import lru_cache
 from pathlib import Path
-from core import search, DATA_DIR
+from profiler import stage, staged
+from core import search, domain_rows, CSV_CONFIG, DATA_DIR, INDEX_DIR, INDEX_VERSION, TOKENIZER
 
 
 # ============ CONFIGURATION ============
@@ -31,65 +44,424 @@ SEARCH_CONFIG = {
     "landing": {"max_results": 2},
     "typography": {"max_results": 2}
 }
+STYLE_NAME_COL = "Style Category"
+
+
+# ============ REASONING INDEX ============
+class _SubstringIndex:
+    """
+    Aho-Corasick automaton over a set of patterns, each carrying a rule index.
+
+    min_match(text) returns the smallest rule index among all patterns that
+    occur in text, in a single pass over text.
+    """
+
+    def __init__(self, patterns: dict):
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]
+        for pattern, rule_idx in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                    self._goto[node][ch] = nxt
+                node = nxt
+            self._best[node] = self._min(self._best[node], rule_idx)
+
+        # Breadth-first failure links; each node also inherits the best rule of its suffixes
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0) if node else 0
+                self._best[nxt] = self._min(self._best[nxt], self._best[self._fail[nxt]])
+
+    @staticmethod
+    def _min(a, b):
+        if a is None:
+            return b
+        return a if b is None else min(a, b)
+
+    def min_match(self, text: str):
+        goto, fail, best = self._goto, self._fail, self._best
+        node, found = 0, None
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best[node] is not None and (found is None or best[node] < found):
+                found = best[node]
+        return found
+
+
+class _ReasoningIndex:
+    """
+    Lookup structures over reasoning rules, built once per ui-reasoning.csv.
+
+    find(category) keeps the exact / partial / keyword matching order and
+    returns the earliest matching rule within a stage.
+    """
+
+    def __init__(self, rules: list):
+        self.exact = {}
+        category_rules = {}
+        keyword_rules = {}
+        self.empty_category_rule = None
+        ui_cats = []
+        self.parsed = []
+
+        for idx, rule in enumerate(rules):
+            ui_cat = (rule.get("UI_Category") or "").lower()
+            ui_cats.append(ui_cat)
+            self.exact.setdefault(ui_cat, idx)
+            if ui_cat:
+                category_rules.setdefault(ui_cat, idx)
+            elif self.empty_category_rule is None:
+                self.empty_category_rule = idx
+            for keyword in ui_cat.replace("/", " ").replace("-", " ").split():
+                keyword_rules.setdefault(keyword, idx)
+            self.parsed.append(self._parse_rule(rule))
+
+        # "ui_cat in category" and "keyword in category": one automaton pass each
+        self.categories = _SubstringIndex(category_rules)
+        self.keywords = _SubstringIndex(keyword_rules)
+        # "category in ui_cat": one find() over all categories, NUL-separated in rule order
+        self.blob = "\0".join(ui_cats)
+        self.starts = []
+        pos = 0
+        for ui_cat in ui_cats:
+            self.starts.append(pos)
+            pos += len(ui_cat) + 1
+
+    @staticmethod
+    def _parse_rule(rule: dict) -> dict:
+        """Reasoning fields of one rule, with Decision_Rules JSON already decoded."""
+        decision_rules = {}
+        try:
+            decision_rules = json.loads(rule.get("Decision_Rules") or "{}")
+        except json.JSONDecodeError:
+            pass
+
+        return {
+            "pattern": rule.get("Recommended_Pattern", ""),
+            "style_priority": [s.strip() for s in (rule.get("Style_Priority") or "").split("+")],
+            "color_mood": rule.get("Color_Mood", ""),
+            "typography_mood": rule.get("Typography_Mood", ""),
+            "key_effects": rule.get("Key_Effects", ""),
+            "anti_patterns": rule.get("Anti_Patterns", ""),
+            "decision_rules": decision_rules,
+            "severity": rule.get("Severity", "MEDIUM")
+        }
+
+    def find(self, category: str):
+        """Index of the matching rule for a category, or None."""
+        category_lower = category.lower()
+
+        # Try exact match first
+        idx = self.exact.get(category_lower)
+        if idx is not None:
+            return idx
+
+        # Try partial match: earliest rule whose category contains, or is contained in, ours
+        contained = _SubstringIndex._min(self.categories.min_match(category_lower), self.empty_category_rule)
+        containing = None
+        if "\0" not in category_lower:
+            pos = self.blob.find(category_lower)
+            if pos >= 0:
+                containing = bisect_right(self.starts, pos) - 1
+        idx = _SubstringIndex._min(contained, containing)
+        if idx is not None:
+            return idx
+
+        # Try keyword match
+        return self.keywords.min_match(category_lower)
+
+
+# Reasoning rules and their index: (stamp, rules, _ReasoningIndex)
+_reasoning_cache = None
+_reasoning_lock = threading.Lock()
+
+
+def _load_reasoning_index():
+    """Reasoning rules and their index, re-read only when ui-reasoning.csv changes."""
+    global _reasoning_cache
+    filepath = DATA_DIR / REASONING_FILE
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return [], _ReasoningIndex([])
+    stamp = (str(filepath), stat.st_mtime_ns, stat.st_size)
+
+    with _reasoning_lock:
+        cached = _reasoning_cache
+    if cached and cached[0] == stamp:
+        return cached[1], cached[2]
+
+    with stage("reasoning.load"):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            rules = list(csv.DictReader(f))
+        index = _ReasoningIndex(rules)
+    with _reasoning_lock:
+        _reasoning_cache = (stamp, rules, index)
+    return rules, index
+
+
+# ============ STYLE NAME INDEX ============
+_NAME_SEPARATOR_RE = re.compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    """Lowercase words of a style name: "HUD/Sci-Fi FUI" -> "hud sci fi fui"."""
+    return _NAME_SEPARATOR_RE.sub(" ", name.lower()).strip()
+
+
+def _trigrams(compact: str) -> set:
+    padded = f"  {compact} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance of a and b, or limit + 1 once it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class _StyleNameIndex:
+    """
+    Normalized style names with a trigram index for typo-tolerant lookup,
+    built from the styles.csv rows.
+
+    resolve(name) compares names with case, spacing and punctuation removed
+    ("E-Ink/Paper" == "E-Ink / Paper"); failing an exact hit, it takes the
+    closest name within a small edit distance ("Glassmorphsm").
+    """
+
+    def __init__(self, rows):
+        self.names = []
+        self._compact = {}
+        self._trigrams = {}
+        self._resolved = {}
+        for row in rows:
+            normalized = _normalize_name(row.get(STYLE_NAME_COL) or "")
+            compact = normalized.replace(" ", "")
+            if not compact or compact in self._compact:
+                continue
+            self._compact[compact] = len(self.names)
+            self.names.append(normalized)
+            for gram in _trigrams(compact):
+                self._trigrams.setdefault(gram, []).append(self._compact[compact])
+
+    @staticmethod
+    def max_distance(compact: str) -> int:
+        """Typos tolerated for a name of this length: 1, plus 1 per 6 characters past 6."""
+        return max(1, len(compact) // 6)
+
+    def resolve(self, name: str):
+        """Normalized style name that name refers to, or None if none is close enough."""
+        compact = _normalize_name(name).replace(" ", "")
+        if compact in self._resolved:
+            return self._resolved[compact]
+
+        match = self._compact.get(compact)
+        if match is None and compact:
+            limit = self.max_distance(compact)
+            grams = _trigrams(compact)
+            shared = Counter(idx for gram in grams for idx in self._trigrams.get(gram, ()))
+            # Each edit breaks at most 3 trigrams, so closer names share at least this many
+            needed = max(1, len(grams) - 3 * limit)
+            best = limit + 1
+            for idx, count in sorted(shared.items(), key=lambda item: (-item[1], item[0])):
+                if count < needed:
+                    break
+                distance = _edit_distance(compact, self.names[idx].replace(" ", ""), best - 1)
+                if distance < best:
+                    match, best = idx, distance
+
+        resolved = self.names[match] if match is not None else None
+        self._resolved[compact] = resolved
+        return resolved
+
+
+# Style name index: (styles.csv stamp, _StyleNameIndex)
+_style_index_cache = None
+_style_index_lock = threading.Lock()
+
+
+def _load_style_index() -> _StyleNameIndex:
+    """Index over every styles.csv style name, rebuilt only when the CSV changes."""
+    global _style_index_cache
+    try:
+        stat = (DATA_DIR / CSV_CONFIG["style"]["file"]).stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+
+    with _style_index_lock:
+        cached = _style_index_cache
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with stage("style_index.load"):
+        index = _StyleNameIndex(domain_rows("style") if stamp else [])
+    with _style_index_lock:
+        _style_index_cache = (stamp, index)
+    return index
+
+
+# ============ CATEGORY SNAPSHOTS ============
+SNAPSHOT_FILE = INDEX_DIR / "design-snapshots.json"
+# Bump when generate() builds a different design system from the same search results
+SNAPSHOT_VERSION = 2
+
+# (snapshot file stamp, source versions, records by query key)
+_snapshot_cache = None
+_snapshot_lock = threading.Lock()
+
+
+def _query_key(query: str) -> str:
+    """Searches only see a query's tokens, so queries with equal keys get equal design systems."""
+    return " ".join(TOKENIZER(query))
+
+
+def _snapshot_sources() -> dict:
+    """Versions of every CSV a design system is generated from."""
+    sources = _data_versions(SEARCH_CONFIG)
+    try:
+        stat = (DATA_DIR / REASONING_FILE).stat()
+        sources[REASONING_FILE] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    except OSError:
+        sources[REASONING_FILE] = None
+    return sources
+
+
+def build_snapshots() -> int:
+    """
+    Precompute the design system of every products.csv category into SNAPSHOT_FILE.
+
+    Records are keyed by the category name's query key and stored without a
+    project name. Returns the number of records written.
+    """
+    sources = _snapshot_sources()
+    generator = DesignSystemGenerator(snapshots=False)
+    records = {}
+    with open(DATA_DIR / CSV_CONFIG["product"]["file"], 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = (row.get("Product Type") or "").strip()
+            key = _query_key(name)
+            if key and key not in records:
+                design_system = generator.generate(name)
+                del design_system["project_name"]
+                records[key] = design_system
+
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    _write_text(SNAPSHOT_FILE, json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "index_version": INDEX_VERSION,
+        "tokenizer": TOKENIZER.signature(),
+        "sources": sources,
+        "records": records
+    }, ensure_ascii=False, separators=(",", ":")))
+    return len(records)
+
+
+def _load_snapshots():
+    """Snapshot records by query key, or None if there is no snapshot or its CSVs changed since."""
+    global _snapshot_cache
+    try:
+        stat = SNAPSHOT_FILE.stat()
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _snapshot_lock:
+        cached = _snapshot_cache
+    if cached is None or cached[0] != stamp:
+        sources, records = None, None
+        try:
+            with open(SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if (snapshot.get("version"), snapshot.get("index_version"), snapshot.get("tokenizer")) == \
+                    (SNAPSHOT_VERSION, INDEX_VERSION, TOKENIZER.signature()):
+                sources, records = snapshot["sources"], snapshot["records"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        cached = (stamp, sources, records)
+        with _snapshot_lock:
+            _snapshot_cache = cached
+
+    _, sources, records = cached
+    if records is None or sources != _snapshot_sources():
+        return None
+    return records
 
 
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
-    def __init__(self):
-        self.reasoning_data = self._load_reasoning()
+    def __init__(self, search_fn=None, snapshots: bool = None):
+        self.reasoning_data, self._reasoning_index = _load_reasoning_index()
+        self._search = search_fn or search
+        # Loaded on first use, then bound to this generator like the reasoning index
+        self._style_index = None
+        # Snapshots hold search() results, so a custom search_fn opts out unless it wraps search()
+        self._snapshots = search_fn is None if snapshots is None else snapshots
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
-        filepath = DATA_DIR / REASONING_FILE
-        if not filepath.exists():
-            return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
+        return _load_reasoning_index()[0]
+
+    @staged("multi_domain_search")
+    def _multi_domain_search(self, query: str, style_priority: list = None, product_result: dict = None) -> dict:
+        """
+        Execute searches across multiple domains.
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
+        Domains run inline in SEARCH_CONFIG order; index loads are CPU-bound
+        (JSON decode, BM25 fit), so worker threads only add overhead under
+        the GIL. A product_result already fetched by the caller is reused.
+        """
         results = {}
         for domain, config in SEARCH_CONFIG.items():
-            if domain == "style" and style_priority:
+            if domain == "product" and product_result is not None:
+                results[domain] = product_result
+            elif domain == "style" and style_priority:
                 # For style, also search with priority keywords
-                priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                priority_query = " ".join(style_priority[:2])
+                results[domain] = self._search(f"{query} {priority_query}", domain, config["max_results"])
             else:
-                results[domain] = search(query, domain, config["max_results"])
+                results[domain] = self._search(query, domain, config["max_results"])
         return results
 
     def _find_reasoning_rule(self, category: str) -> dict:
         """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
+        idx = self._reasoning_index.find(category)
+        return self.reasoning_data[idx] if idx is not None else {}
 
+    @staged("reasoning")
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        idx = self._reasoning_index.find(category)
 
-        if not rule:
+        if idx is None:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -101,69 +473,106 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
+        # Fresh containers so callers may modify the result without touching the index
+        parsed = self._reasoning_index.parsed[idx]
+        decision_rules = parsed["decision_rules"]
         return {
-            "pattern": rule.get("Recommended_Pattern", ""),
-            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
-            "color_mood": rule.get("Color_Mood", ""),
-            "typography_mood": rule.get("Typography_Mood", ""),
-            "key_effects": rule.get("Key_Effects", ""),
-            "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
-            "severity": rule.get("Severity", "MEDIUM")
+            **parsed,
+            "style_priority": list(parsed["style_priority"]),
+            # Valid JSON that is not an object (a list, a string) passes through as-is
+            "decision_rules": dict(decision_rules) if isinstance(decision_rules, dict) else decision_rules
         }
 
+    @staged("select_style")
     def _select_best_match(self, results: list, priority_keywords: list) -> dict:
-        """Select best matching result based on priority keywords."""
+        """
+        Select best matching result based on priority keywords.
+
+        Style names are compared normalized (case, spacing, punctuation). Only
+        when no priority matches exactly does a priority with a typo match the
+        style it resolves to in the style-name index.
+        """
         if not results:
             return {}
 
         if not priority_keywords:
             return results[0]
 
-        # First: try exact style name match
+        # First: try exact style name match for every priority
+        names = [_normalize_name(result.get(STYLE_NAME_COL, "")) for result in results]
         for priority in priority_keywords:
-            priority_lower = priority.lower().strip()
-            for result in results:
-                style_name = result.get("Style Category", "").lower()
-                if priority_lower in style_name or style_name in priority_lower:
+            wanted = _normalize_name(priority)
+            for result, name in zip(results, names):
+                if wanted in name or name in wanted:
                     return result
 
-        # Second: score by keyword match in all fields
-        scored = []
+        # Then the typo-tolerant match, so it never displaces an exact one
+        if self._style_index is None:
+            self._style_index = _load_style_index()
+        for priority in priority_keywords:
+            resolved = self._style_index.resolve(priority)
+            if resolved is not None:
+                for result, name in zip(results, names):
+                    if name == resolved:
+                        return result
+
+        # Second: score by keyword match in all fields (first best result wins ties)
+        keywords = [kw.lower().strip() for kw in priority_keywords]
+        best, best_score = results[0], 0
         for result in results:
-            result_str = str(result).lower()
+            name_lower = result.get(STYLE_NAME_COL, "").lower()
+            keywords_lower = result.get("Keywords", "").lower()
+            # The whole result is only lowercased once a keyword misses both fields above
+            text_lower = None
             score = 0
-            for kw in priority_keywords:
-                kw_lower = kw.lower().strip()
+            for kw_lower in keywords:
                 # Higher score for style name match
-                if kw_lower in result.get("Style Category", "").lower():
+                if kw_lower in name_lower:
                     score += 10
                 # Lower score for keyword field match
-                elif kw_lower in result.get("Keywords", "").lower():
+                elif kw_lower in keywords_lower:
                     score += 3
-                # Even lower for other field matches
-                elif kw_lower in result_str:
-                    score += 1
-            scored.append((score, result))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored[0][1] if scored and scored[0][0] > 0 else results[0]
+                else:
+                    # Even lower for other field matches
+                    if text_lower is None:
+                        text_lower = str(result).lower()
+                    if kw_lower in text_lower:
+                        score += 1
+            if score > best_score:
+                best, best_score = result, score
+        return best
 
     def _extract_results(self, search_result: dict) -> list:
         """Extract results list from search result dict."""
         return search_result.get("results", [])
 
+    @staged("snapshot")
+    def _from_snapshot(self, query: str, project_name: str = None):
+        """The precomputed design system for a query matching a product category, or None."""
+        record = (_load_snapshots() or {}).get(_query_key(query))
+        if record is None:
+            return None
+        # Fresh containers so callers may modify the result without touching the snapshot
+        return {
+            "project_name": project_name or query.upper(),
+            **{key: dict(value) if isinstance(value, dict) else value for key, value in record.items()}
+        }
+
+    @staged("generate")
     def generate(self, query: str, project_name: str = None) -> dict:
-        """Generate complete design system recommendation."""
+        """
+        Generate complete design system recommendation.
+
+        Queries with the same tokens as a products.csv category are answered
+        from the category snapshot (see build_snapshots) while it is current.
+        """
+        if self._snapshots:
+            design_system = self._from_snapshot(query, project_name)
+            if design_system is not None:
+                return design_system
+
         # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        product_result = self._search(query, "product", 1)
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
@@ -173,9 +582,8 @@ class DesignSystemGenerator:
         reasoning = self._apply_reasoning(category, {})
         style_priority = reasoning.get("style_priority", [])
 
-        # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        # Step 3: Multi-domain search with style priority hints (reuses the product search)
+        search_results = self._multi_domain_search(query, style_priority, product_result)
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -239,8 +647,42 @@ class DesignSystemGenerator:
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
-def format_ascii_box(design_system: dict) -> str:
-    """Format design system as ASCII box with emojis (MCP-style)."""
+# Formatters come in pairs: iter_* yields lines (without newlines) and
+# format_* joins them; write_lines() streams any of them to a file handle.
+
+
+@lru_cache(maxsize=4096)
+def _wrap_text(text: str, prefix: str, width: int) -> tuple:
+    """Wrap long text into multiple lines (cached: briefs repeat the same style/color text)."""
+    if not text:
+        return ()
+    words = text.split()
+    lines = []
+    current_line = prefix
+    for word in words:
+        if len(current_line) + len(word) + 1 <= width - 2:
+            current_line += (" " if current_line != prefix else "") + word
+        else:
+            if current_line != prefix:
+                lines.append(current_line)
+            current_line = prefix + word
+    if current_line != prefix:
+        lines.append(current_line)
+    return tuple(lines)
+
+
+def write_lines(lines, out) -> None:
+    """Write rendered lines to a file handle as they are produced ("\\n"-joined, like format_*)."""
+    first = True
+    for line in lines:
+        if not first:
+            out.write("\n")
+        out.write(line)
+        first = False
+
+
+def iter_ascii_box(design_system: dict):
+    """Yield the ASCII box (MCP-style) line by line."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -249,103 +691,83 @@ def format_ascii_box(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    def wrap_text(text: str, prefix: str, width: int) -> list:
-        """Wrap long text into multiple lines."""
-        if not text:
-            return []
-        words = text.split()
-        lines = []
-        current_line = prefix
-        for word in words:
-            if len(current_line) + len(word) + 1 <= width - 2:
-                current_line += (" " if current_line != prefix else "") + word
-            else:
-                if current_line != prefix:
-                    lines.append(current_line)
-                current_line = prefix + word
-        if current_line != prefix:
-            lines.append(current_line)
-        return lines
-
     # Build sections from pattern
     sections = pattern.get("sections", "").split(">")
     sections = [s.strip() for s in sections if s.strip()]
 
-    # Build output lines
-    lines = []
     w = BOX_WIDTH - 1
 
-    lines.append("+" + "-" * w + "+")
-    lines.append(f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM".ljust(BOX_WIDTH) + "|")
-    lines.append("+" + "-" * w + "+")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+    yield "+" + "-" * w + "+"
+    yield f"|  TARGET: {project} - RECOMMENDED DESIGN SYSTEM".ljust(BOX_WIDTH) + "|"
+    yield "+" + "-" * w + "+"
+    yield "|" + " " * BOX_WIDTH + "|"
 
     # Pattern section
-    lines.append(f"|  PATTERN: {pattern.get('name', '')}".ljust(BOX_WIDTH) + "|")
+    yield f"|  PATTERN: {pattern.get('name', '')}".ljust(BOX_WIDTH) + "|"
     if pattern.get('conversion'):
-        lines.append(f"|     Conversion: {pattern.get('conversion', '')}".ljust(BOX_WIDTH) + "|")
+        yield f"|     Conversion: {pattern.get('conversion', '')}".ljust(BOX_WIDTH) + "|"
     if pattern.get('cta_placement'):
-        lines.append(f"|     CTA: {pattern.get('cta_placement', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append("|     Sections:".ljust(BOX_WIDTH) + "|")
+        yield f"|     CTA: {pattern.get('cta_placement', '')}".ljust(BOX_WIDTH) + "|"
+    yield "|     Sections:".ljust(BOX_WIDTH) + "|"
     for i, section in enumerate(sections, 1):
-        lines.append(f"|       {i}. {section}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield f"|       {i}. {section}".ljust(BOX_WIDTH) + "|"
+    yield "|" + " " * BOX_WIDTH + "|"
 
     # Style section
-    lines.append(f"|  STYLE: {style.get('name', '')}".ljust(BOX_WIDTH) + "|")
+    yield f"|  STYLE: {style.get('name', '')}".ljust(BOX_WIDTH) + "|"
     if style.get("keywords"):
-        for line in wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        for line in _wrap_text(f"Keywords: {style.get('keywords', '')}", "|     ", BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
     if style.get("best_for"):
-        for line in wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        for line in _wrap_text(f"Best For: {style.get('best_for', '')}", "|     ", BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
     if style.get("performance") or style.get("accessibility"):
         perf_a11y = f"Performance: {style.get('performance', '')} | Accessibility: {style.get('accessibility', '')}"
-        lines.append(f"|     {perf_a11y}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield f"|     {perf_a11y}".ljust(BOX_WIDTH) + "|"
+    yield "|" + " " * BOX_WIDTH + "|"
 
     # Colors section
-    lines.append("|  COLORS:".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Primary:    {colors.get('primary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Secondary:  {colors.get('secondary', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     CTA:        {colors.get('cta', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Background: {colors.get('background', '')}".ljust(BOX_WIDTH) + "|")
-    lines.append(f"|     Text:       {colors.get('text', '')}".ljust(BOX_WIDTH) + "|")
+    yield "|  COLORS:".ljust(BOX_WIDTH) + "|"
+    yield f"|     Primary:    {colors.get('primary', '')}".ljust(BOX_WIDTH) + "|"
+    yield f"|     Secondary:  {colors.get('secondary', '')}".ljust(BOX_WIDTH) + "|"
+    yield f"|     CTA:        {colors.get('cta', '')}".ljust(BOX_WIDTH) + "|"
+    yield f"|     Background: {colors.get('background', '')}".ljust(BOX_WIDTH) + "|"
+    yield f"|     Text:       {colors.get('text', '')}".ljust(BOX_WIDTH) + "|"
     if colors.get("notes"):
-        for line in wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        for line in _wrap_text(f"Notes: {colors.get('notes', '')}", "|     ", BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
+    yield "|" + " " * BOX_WIDTH + "|"
 
     # Typography section
-    lines.append(f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "|")
+    yield f"|  TYPOGRAPHY: {typography.get('heading', '')} / {typography.get('body', '')}".ljust(BOX_WIDTH) + "|"
     if typography.get("mood"):
-        for line in wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        for line in _wrap_text(f"Mood: {typography.get('mood', '')}", "|     ", BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
     if typography.get("best_for"):
-        for line in wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
+        for line in _wrap_text(f"Best For: {typography.get('best_for', '')}", "|     ", BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
     if typography.get("google_fonts_url"):
-        lines.append(f"|     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "|")
+        yield f"|     Google Fonts: {typography.get('google_fonts_url', '')}".ljust(BOX_WIDTH) + "|"
     if typography.get("css_import"):
-        lines.append(f"|     CSS Import: {typography.get('css_import', '')[:70]}...".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield f"|     CSS Import: {typography.get('css_import', '')[:70]}...".ljust(BOX_WIDTH) + "|"
+    yield "|" + " " * BOX_WIDTH + "|"
 
     # Key Effects section
     if effects:
-        lines.append("|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(effects, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
+        yield "|  KEY EFFECTS:".ljust(BOX_WIDTH) + "|"
+        for line in _wrap_text(effects, "|     ", BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
+        yield "|" + " " * BOX_WIDTH + "|"
 
     # Anti-patterns section
     if anti_patterns:
-        lines.append("|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|")
-        for line in wrap_text(anti_patterns, "|     ", BOX_WIDTH):
-            lines.append(line.ljust(BOX_WIDTH) + "|")
-        lines.append("|" + " " * BOX_WIDTH + "|")
+        yield "|  AVOID (Anti-patterns):".ljust(BOX_WIDTH) + "|"
+        for line in _wrap_text(anti_patterns, "|     ", BOX_WIDTH):
+            yield line.ljust(BOX_WIDTH) + "|"
+        yield "|" + " " * BOX_WIDTH + "|"
 
     # Pre-Delivery Checklist section
-    lines.append("|  PRE-DELIVERY CHECKLIST:".ljust(BOX_WIDTH) + "|")
+    yield "|  PRE-DELIVERY CHECKLIST:".ljust(BOX_WIDTH) + "|"
     checklist_items = [
         "[ ] No emojis as icons (use SVG: Heroicons/Lucide)",
         "[ ] cursor-pointer on all clickable elements",
@@ -356,16 +778,20 @@ def format_ascii_box(design_system: dict) -> str:
         "[ ] Responsive: 375px, 768px, 1024px, 1440px"
     ]
     for item in checklist_items:
-        lines.append(f"|     {item}".ljust(BOX_WIDTH) + "|")
-    lines.append("|" + " " * BOX_WIDTH + "|")
+        yield f"|     {item}".ljust(BOX_WIDTH) + "|"
+    yield "|" + " " * BOX_WIDTH + "|"
+
+    yield "+" + "-" * w + "+"
 
-    lines.append("+" + "-" * w + "+")
 
-    return "\n".join(lines)
+@staged("format.ascii_box")
+def format_ascii_box(design_system: dict) -> str:
+    """Format design system as ASCII box with emojis (MCP-style)."""
+    return "\n".join(iter_ascii_box(design_system))
 
 
-def format_markdown(design_system: dict) -> str:
-    """Format design system as markdown."""
+def iter_markdown(design_system: dict):
+    """Yield the markdown design system line by line."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -374,93 +800,96 @@ def format_markdown(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
 
-    lines = []
-    lines.append(f"## Design System: {project}")
-    lines.append("")
+    yield f"## Design System: {project}"
+    yield ""
 
     # Pattern section
-    lines.append("### Pattern")
-    lines.append(f"- **Name:** {pattern.get('name', '')}")
+    yield "### Pattern"
+    yield f"- **Name:** {pattern.get('name', '')}"
     if pattern.get('conversion'):
-        lines.append(f"- **Conversion Focus:** {pattern.get('conversion', '')}")
+        yield f"- **Conversion Focus:** {pattern.get('conversion', '')}"
     if pattern.get('cta_placement'):
-        lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
+        yield f"- **CTA Placement:** {pattern.get('cta_placement', '')}"
     if pattern.get('color_strategy'):
-        lines.append(f"- **Color Strategy:** {pattern.get('color_strategy', '')}")
-    lines.append(f"- **Sections:** {pattern.get('sections', '')}")
-    lines.append("")
+        yield f"- **Color Strategy:** {pattern.get('color_strategy', '')}"
+    yield f"- **Sections:** {pattern.get('sections', '')}"
+    yield ""
 
     # Style section
-    lines.append("### Style")
-    lines.append(f"- **Name:** {style.get('name', '')}")
+    yield "### Style"
+    yield f"- **Name:** {style.get('name', '')}"
     if style.get('keywords'):
-        lines.append(f"- **Keywords:** {style.get('keywords', '')}")
+        yield f"- **Keywords:** {style.get('keywords', '')}"
     if style.get('best_for'):
-        lines.append(f"- **Best For:** {style.get('best_for', '')}")
+        yield f"- **Best For:** {style.get('best_for', '')}"
     if style.get('performance') or style.get('accessibility'):
-        lines.append(f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}")
-    lines.append("")
+        yield f"- **Performance:** {style.get('performance', '')} | **Accessibility:** {style.get('accessibility', '')}"
+    yield ""
 
     # Colors section
-    lines.append("### Colors")
-    lines.append(f"| Role | Hex |")
-    lines.append(f"|------|-----|")
-    lines.append(f"| Primary | {colors.get('primary', '')} |")
-    lines.append(f"| Secondary | {colors.get('secondary', '')} |")
-    lines.append(f"| CTA | {colors.get('cta', '')} |")
-    lines.append(f"| Background | {colors.get('background', '')} |")
-    lines.append(f"| Text | {colors.get('text', '')} |")
+    yield "### Colors"
+    yield f"| Role | Hex |"
+    yield f"|------|-----|"
+    yield f"| Primary | {colors.get('primary', '')} |"
+    yield f"| Secondary | {colors.get('secondary', '')} |"
+    yield f"| CTA | {colors.get('cta', '')} |"
+    yield f"| Background | {colors.get('background', '')} |"
+    yield f"| Text | {colors.get('text', '')} |"
     if colors.get("notes"):
-        lines.append(f"\n*Notes: {colors.get('notes', '')}*")
-    lines.append("")
+        yield f"\n*Notes: {colors.get('notes', '')}*"
+    yield ""
 
     # Typography section
-    lines.append("### Typography")
-    lines.append(f"- **Heading:** {typography.get('heading', '')}")
-    lines.append(f"- **Body:** {typography.get('body', '')}")
+    yield "### Typography"
+    yield f"- **Heading:** {typography.get('heading', '')}"
+    yield f"- **Body:** {typography.get('body', '')}"
     if typography.get("mood"):
-        lines.append(f"- **Mood:** {typography.get('mood', '')}")
+        yield f"- **Mood:** {typography.get('mood', '')}"
     if typography.get("best_for"):
-        lines.append(f"- **Best For:** {typography.get('best_for', '')}")
+        yield f"- **Best For:** {typography.get('best_for', '')}"
     if typography.get("google_fonts_url"):
-        lines.append(f"- **Google Fonts:** {typography.get('google_fonts_url', '')}")
+        yield f"- **Google Fonts:** {typography.get('google_fonts_url', '')}"
     if typography.get("css_import"):
-        lines.append(f"- **CSS Import:**")
-        lines.append(f"```css")
-        lines.append(f"{typography.get('css_import', '')}")
-        lines.append(f"```")
-    lines.append("")
+        yield f"- **CSS Import:**"
+        yield f"```css"
+        yield f"{typography.get('css_import', '')}"
+        yield f"```"
+    yield ""
 
     # Key Effects section
     if effects:
-        lines.append("### Key Effects")
-        lines.append(f"{effects}")
-        lines.append("")
+        yield "### Key Effects"
+        yield f"{effects}"
+        yield ""
 
     # Anti-patterns section
     if anti_patterns:
-        lines.append("### Avoid (Anti-patterns)")
+        yield "### Avoid (Anti-patterns)"
         newline_bullet = '\n- '
-        lines.append(f"- {anti_patterns.replace(' + ', newline_bullet)}")
-        lines.append("")
+        yield f"- {anti_patterns.replace(' + ', newline_bullet)}"
+        yield ""
 
     # Pre-Delivery Checklist section
-    lines.append("### Pre-Delivery Checklist")
-    lines.append("- [ ] No emojis as icons (use SVG: Heroicons/Lucide)")
-    lines.append("- [ ] cursor-pointer on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard nav")
-    lines.append("- [ ] prefers-reduced-motion respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("")
-
-    return "\n".join(lines)
+    yield "### Pre-Delivery Checklist"
+    yield "- [ ] No emojis as icons (use SVG: Heroicons/Lucide)"
+    yield "- [ ] cursor-pointer on all clickable elements"
+    yield "- [ ] Hover states with smooth transitions (150-300ms)"
+    yield "- [ ] Light mode: text contrast 4.5:1 minimum"
+    yield "- [ ] Focus states visible for keyboard nav"
+    yield "- [ ] prefers-reduced-motion respected"
+    yield "- [ ] Responsive: 375px, 768px, 1024px, 1440px"
+    yield ""
+
+
+@staged("format.markdown")
+def format_markdown(design_system: dict) -> str:
+    """Format design system as markdown."""
+    return "\n".join(iter_markdown(design_system))
 
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None, out=None) -> str:
     """
     Main entry point for design system generation.
 
@@ -471,26 +900,216 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        out: Optional file handle; output is streamed to it (before persisting) instead of returned
 
     Returns:
-        Formatted design system string
+        Formatted design system string, or None when streamed to out
     """
     generator = DesignSystemGenerator()
     design_system = generator.generate(query, project_name)
+    lines = iter_markdown(design_system) if output_format == "markdown" else iter_ascii_box(design_system)
+
+    if out is not None:
+        with stage("render"):
+            write_lines(lines, out)
+            out.write("\n")
+            out.flush()
+        if persist:
+            persist_design_system(design_system, page, output_dir, query)
+        return None
     
     # Persist to files if requested
     if persist:
         persist_design_system(design_system, page, output_dir, query)
 
-    if output_format == "markdown":
-        return format_markdown(design_system)
-    return format_ascii_box(design_system)
+    with stage("render"):
+        return "\n".join(lines)
+
+
+# ============ BULK GENERATION ============
+WRITE_WORKERS = 8
+
+
+class _SearchMemo:
+    """Thread-safe memo over search(), shared by every brief of a bulk run."""
+
+    def __init__(self, search_fn=None):
+        self._search = search_fn or search
+        self._results = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, query, domain=None, max_results=3):
+        key = (query, domain, max_results)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        result = self._search(query, domain, max_results)
+        with self._lock:
+            self._results.setdefault(key, result)
+            self.misses += 1
+        return result
+
+
+def _parse_brief(brief) -> tuple:
+    """
+    (query, project_name, [(page, page_query)], output_dir) from a brief dict.
+
+    Raises ValueError naming the first malformed field. An exception in
+    place of a brief (e.g. a line that failed to decode) is re-raised as
+    ValueError, so its error record keeps the brief's position.
+    """
+    if isinstance(brief, Exception):
+        raise ValueError(str(brief))
+    if not isinstance(brief, dict):
+        raise ValueError("brief must be a JSON object")
+    query = str(brief.get("query") or "").strip()
+    if not query:
+        raise ValueError("brief needs a non-empty 'query'")
+    for field in ("project_name", "output_dir"):
+        value = brief.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{field} must be a string, got {type(value).__name__}")
+    raw_pages = brief.get("pages")
+    if raw_pages is not None and not isinstance(raw_pages, list):
+        raise ValueError(f"pages must be a list, got {type(raw_pages).__name__}")
+
+    pages = []
+    for page in raw_pages or []:
+        if isinstance(page, str) and page.strip():
+            pages.append((page, query))
+        elif isinstance(page, dict) and page.get("name"):
+            pages.append((str(page["name"]), page.get("query") or query))
+        else:
+            raise ValueError(f"Invalid page entry: {page!r}")
+    return query, brief.get("project_name"), pages, brief.get("output_dir")
+
+
+def _timed_write(path: Path, content: str) -> tuple:
+    """Write a file; returns (seconds spent, perf_counter when done)."""
+    start = time.perf_counter()
+    _write_text(path, content)
+    done = time.perf_counter()
+    return done - start, done
+
+
+def generate_design_systems(briefs, output_dir: str = None, workers: int = WRITE_WORKERS, stats: dict = None):
+    """
+    Generate and persist design systems for many briefs in one run.
+
+    briefs: iterable of {"query": ..., "project_name": ..., "pages": [name or {"name", "query"}],
+            "output_dir": ...}; a brief's output_dir overrides the output_dir argument.
+            An exception in place of a brief yields an error record at its position.
+
+    One generator and one search memo are shared, so identical sub-searches
+    across briefs and pages run once. MASTER.md and page files are written
+    by a pool of `workers` threads. Yields one record per brief, in input
+    order, with the written files and per-stage timings in milliseconds.
+    If `stats` is a dict, search counts are stored in it when the run ends.
+    """
+    memo = _SearchMemo()
+    generator = DesignSystemGenerator(search_fn=memo, snapshots=True)
+    pending_dirs = {}
+
+    def finish(job):
+        record, started, finished, futures, design_system_dir = job
+        # Forget settled writes so memory stays flat over long batches
+        if pending_dirs.get(design_system_dir) is futures:
+            del pending_dirs[design_system_dir]
+        if futures:
+            try:
+                writes = [f.result() for f in futures]
+            except OSError as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+            else:
+                record["timings_ms"]["write"] = round(sum(spent for spent, _ in writes) * 1000, 2)
+                finished = max(finished, max(done for _, done in writes))
+        record["timings_ms"]["total"] = round((finished - started) * 1000, 2)
+        return record
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="design-write") as pool:
+        previous = None
+        for position, brief in enumerate(briefs):
+            started = time.perf_counter()
+            record = {"index": position}
+            if isinstance(brief, dict) and brief.get("id") is not None:
+                record["id"] = brief["id"]
+            futures, design_system_dir = [], None
+            try:
+                query, project_name, pages, brief_dir = _parse_brief(brief)
+                design_system = generator.generate(query, project_name)
+                generated = time.perf_counter()
+
+                project_slug = design_system.get("project_name", "default").lower().replace(' ', '-')
+                design_system_dir = Path(brief_dir or output_dir or Path.cwd()) / "design-system" / project_slug
+                (design_system_dir / "pages").mkdir(parents=True, exist_ok=True)
+
+                # A later brief for the same project must see the earlier brief's files and manifest
+                for earlier in pending_dirs.pop(design_system_dir, []):
+                    earlier.result()
+                manifest = _load_manifest(design_system_dir)
+                created, files = [], []
+                for name, render, inputs in _persist_plan(design_system, pages, query, memo, manifest):
+                    content = _plan_file(manifest, design_system_dir, name, inputs, render)
+                    created.append(str(design_system_dir / name))
+                    if content is not None:
+                        files.append((design_system_dir / name, content))
+                _save_manifest(design_system_dir, manifest)
+                rendered = time.perf_counter()
+
+                futures = [pool.submit(_timed_write, path, content) for path, content in files]
+                pending_dirs[design_system_dir] = futures
+                written = {str(path) for path, _ in files}
+
+                record.update({
+                    "project_name": design_system.get("project_name"),
+                    "category": design_system.get("category"),
+                    "design_system_dir": str(design_system_dir),
+                    "created_files": created,
+                    "skipped_files": [path for path in created if path not in written],
+                    "timings_ms": {
+                        "generate": round((generated - started) * 1000, 2),
+                        "render": round((rendered - generated) * 1000, 2)
+                    }
+                })
+            except Exception as e:
+                # One bad brief gets an error record; the rest of the batch still runs
+                record.update({"error": f"{type(e).__name__}: {e}", "timings_ms": {}})
+
+            # Report each brief once its writes are done, while the next brief is generated
+            if previous is not None:
+                yield finish(previous)
+            previous = (record, started, time.perf_counter(), futures, design_system_dir)
+
+        if previous is not None:
+            yield finish(previous)
+
+    if stats is not None:
+        stats.update({"searches": memo.misses, "deduplicated": memo.hits})
 
 
 # ============ PERSISTENCE FUNCTIONS ============
+MANIFEST_NAME = ".manifest.json"
+# Bump when the rendered Markdown changes, so existing files are regenerated
+MANIFEST_VERSION = 1
+# CSVs behind each persisted file (page overrides run their own style/ux/landing searches)
+MASTER_SOURCES = tuple(SEARCH_CONFIG)
+PAGE_SOURCES = ("style", "ux", "landing")
+
+
+@staged("persist")
 def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
+
+    Writes are incremental: design-system/<project>/.manifest.json records the
+    inputs behind each file. A file whose inputs are unchanged is skipped
+    without rendering; otherwise it is re-rendered and only rewritten
+    (atomically) if its content actually differs.
     
     Args:
         design_system: The generated design system dictionary
@@ -499,7 +1118,8 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
         page_query: Optional query string for intelligent page override generation
     
     Returns:
-        dict with created file paths and status
+        dict with created file paths and status; written_files / skipped_files
+        split created_files by whether they were rewritten
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
@@ -511,36 +1131,172 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     pages_dir = design_system_dir / "pages"
     
     created_files = []
+    written_files = []
     
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
     pages_dir.mkdir(parents=True, exist_ok=True)
-    
-    master_file = design_system_dir / "MASTER.md"
-    
-    # Generate and write MASTER.md
-    master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
-    
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+
+    manifest = _load_manifest(design_system_dir)
+    for name, render, inputs in _persist_plan(design_system, [(page, page_query)] if page else [], page_query,
+                                              manifest=manifest):
+        content = _plan_file(manifest, design_system_dir, name, inputs, render)
+        path = design_system_dir / name
+        if content is not None:
+            _write_text(path, content)
+            written_files.append(str(path))
+        created_files.append(str(path))
+    _save_manifest(design_system_dir, manifest)
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "written_files": written_files,
+        "skipped_files": [path for path in created_files if path not in written_files]
     }
 
 
-def format_master_md(design_system: dict) -> str:
-    """Format design system as MASTER.md with hierarchical override logic."""
+def _persist_plan(design_system: dict, pages: list, query: str = None, search_fn=None, manifest: dict = None) -> list:
+    """
+    (relative name, render(timestamp), inputs) for MASTER.md and each (page, page_query).
+
+    Page overrides are planned together on the first page render, for every
+    page whose inputs differ from the manifest (the ones that will render).
+    """
+    plan = [(
+        "MASTER.md",
+        lambda timestamp: format_master_md(design_system, timestamp),
+        _file_inputs(design_system, MASTER_SOURCES, query=query)
+    )]
+    stale, planned = [], {}
+
+    def render_page(timestamp, page, page_query):
+        key = (page, page_query)
+        if key not in planned:
+            batch = [k for k in stale if k not in planned]
+            planned.update(plan_page_overrides(batch if key in batch else batch + [key], search_fn))
+        return format_page_override_md(design_system, page, page_query, search_fn, timestamp, planned[key])
+
+    files = (manifest or {}).get("files", {})
+    for page, page_query in pages:
+        name = f"pages/{page.lower().replace(' ', '-')}.md"
+        inputs = _file_inputs(design_system, PAGE_SOURCES, query=page_query, page=page)
+        if (files.get(name) or {}).get("inputs") != inputs["digest"]:
+            stale.append((page, page_query))
+        plan.append((
+            name,
+            lambda timestamp, page=page, page_query=page_query: render_page(timestamp, page, page_query),
+            inputs
+        ))
+    return plan
+
+
+def _data_versions(domains) -> dict:
+    """mtime/size stamp of each domain CSV a file is generated from."""
+    versions = {}
+    for domain in domains:
+        filepath = DATA_DIR / CSV_CONFIG[domain]["file"]
+        try:
+            stat = filepath.stat()
+            versions[CSV_CONFIG[domain]["file"]] = f"{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            versions[CSV_CONFIG[domain]["file"]] = None
+    return versions
+
+
+def _file_inputs(design_system: dict, domains, query: str = None, page: str = None) -> dict:
+    """Manifest fields describing what a file is generated from, plus their digest."""
+    inputs = {"query": query, "page": page, "data": _data_versions(domains)}
+    payload = json.dumps({"version": MANIFEST_VERSION, "design_system": design_system, **inputs},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    inputs["digest"] = _sha256(payload)
+    return inputs
+
+
+def _sha256(text: str) -> str:
+    import hashlib
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _now() -> str:
+    """Generated-at timestamp of persisted files."""
+    from datetime import datetime
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _file_sha256(path: Path):
+    """Digest of a file's text as it would be rendered, or None if unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return _sha256(f.read())
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _plan_file(manifest: dict, design_system_dir: Path, name: str, inputs: dict, render) -> str:
+    """
+    Content to write for one persisted file, or None if it is already up to date.
+
+    Unchanged inputs skip rendering. Changed inputs re-render with the
+    previous timestamp first, so a file whose content did not change keeps
+    its bytes (and mtime); only real changes get a new timestamp.
+    """
+    entry = manifest["files"].get(name)
+    current = _file_sha256(design_system_dir / name)
+    fields = {key: inputs[key] for key in ("query", "page", "data")}
+
+    if entry and current and entry.get("sha256") == current:
+        if entry.get("inputs") == inputs["digest"]:
+            return None
+        if entry.get("generated"):
+            content = render(entry["generated"])
+            if _sha256(content) == current:
+                entry.update(fields, inputs=inputs["digest"])
+                return None
+
+    timestamp = _now()
+    content = render(timestamp)
+    manifest["files"][name] = {**fields, "inputs": inputs["digest"], "sha256": _sha256(content), "generated": timestamp}
+    return content
+
+
+def _load_manifest(design_system_dir: Path) -> dict:
+    try:
+        with open(design_system_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION and isinstance(manifest.get("files"), dict):
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def _save_manifest(design_system_dir: Path, manifest: dict):
+    content = json.dumps(manifest, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+    path = design_system_dir / MANIFEST_NAME
+    if _file_sha256(path) != _sha256(content):
+        _write_text(path, content)
+
+
+@staged("write")
+def _write_text(path: Path, content: str):
+    """Atomically replace one persisted file (temp file in the same directory + rename)."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def iter_master_md(design_system: dict, timestamp: str = None):
+    """Yield MASTER.md line by line."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
     style = design_system.get("style", {})
@@ -549,394 +1305,462 @@ def format_master_md(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
     
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    lines = []
+    timestamp = timestamp or _now()
     
     # Logic header
-    lines.append("# Design System Master File")
-    lines.append("")
-    lines.append("> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`.")
-    lines.append("> If that file exists, its rules **override** this Master file.")
-    lines.append("> If not, strictly follow the rules below.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append(f"**Project:** {project}")
-    lines.append(f"**Generated:** {timestamp}")
-    lines.append(f"**Category:** {design_system.get('category', 'General')}")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    yield "# Design System Master File"
+    yield ""
+    yield "> **LOGIC:** When building a specific page, first check `design-system/pages/[page-name].md`."
+    yield "> If that file exists, its rules **override** this Master file."
+    yield "> If not, strictly follow the rules below."
+    yield ""
+    yield "---"
+    yield ""
+    yield f"**Project:** {project}"
+    yield f"**Generated:** {timestamp}"
+    yield f"**Category:** {design_system.get('category', 'General')}"
+    yield ""
+    yield "---"
+    yield ""
     
     # Global Rules section
-    lines.append("## Global Rules")
-    lines.append("")
+    yield "## Global Rules"
+    yield ""
     
     # Color Palette
-    lines.append("### Color Palette")
-    lines.append("")
-    lines.append("| Role | Hex | CSS Variable |")
-    lines.append("|------|-----|--------------|")
-    lines.append(f"| Primary | `{colors.get('primary', '#2563EB')}` | `--color-primary` |")
-    lines.append(f"| Secondary | `{colors.get('secondary', '#3B82F6')}` | `--color-secondary` |")
-    lines.append(f"| CTA/Accent | `{colors.get('cta', '#F97316')}` | `--color-cta` |")
-    lines.append(f"| Background | `{colors.get('background', '#F8FAFC')}` | `--color-background` |")
-    lines.append(f"| Text | `{colors.get('text', '#1E293B')}` | `--color-text` |")
-    lines.append("")
+    yield "### Color Palette"
+    yield ""
+    yield "| Role | Hex | CSS Variable |"
+    yield "|------|-----|--------------|"
+    yield f"| Primary | `{colors.get('primary', '#2563EB')}` | `--color-primary` |"
+    yield f"| Secondary | `{colors.get('secondary', '#3B82F6')}` | `--color-secondary` |"
+    yield f"| CTA/Accent | `{colors.get('cta', '#F97316')}` | `--color-cta` |"
+    yield f"| Background | `{colors.get('background', '#F8FAFC')}` | `--color-background` |"
+    yield f"| Text | `{colors.get('text', '#1E293B')}` | `--color-text` |"
+    yield ""
     if colors.get("notes"):
-        lines.append(f"**Color Notes:** {colors.get('notes', '')}")
-        lines.append("")
+        yield f"**Color Notes:** {colors.get('notes', '')}"
+        yield ""
     
     # Typography
-    lines.append("### Typography")
-    lines.append("")
-    lines.append(f"- **Heading Font:** {typography.get('heading', 'Inter')}")
-    lines.append(f"- **Body Font:** {typography.get('body', 'Inter')}")
+    yield "### Typography"
+    yield ""
+    yield f"- **Heading Font:** {typography.get('heading', 'Inter')}"
+    yield f"- **Body Font:** {typography.get('body', 'Inter')}"
     if typography.get("mood"):
-        lines.append(f"- **Mood:** {typography.get('mood', '')}")
+        yield f"- **Mood:** {typography.get('mood', '')}"
     if typography.get("google_fonts_url"):
-        lines.append(f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]({typography.get('google_fonts_url', '')})")
-    lines.append("")
+        yield f"- **Google Fonts:** [{typography.get('heading', '')} + {typography.get('body', '')}]({typography.get('google_fonts_url', '')})"
+    yield ""
     if typography.get("css_import"):
-        lines.append("**CSS Import:**")
-        lines.append("```css")
-        lines.append(typography.get("css_import", ""))
-        lines.append("```")
-        lines.append("")
+        yield "**CSS Import:**"
+        yield "```css"
+        yield typography.get("css_import", "")
+        yield "```"
+        yield ""
     
     # Spacing Variables
-    lines.append("### Spacing Variables")
-    lines.append("")
-    lines.append("| Token | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--space-xs` | `4px` / `0.25rem` | Tight gaps |")
-    lines.append("| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |")
-    lines.append("| `--space-md` | `16px` / `1rem` | Standard padding |")
-    lines.append("| `--space-lg` | `24px` / `1.5rem` | Section padding |")
-    lines.append("| `--space-xl` | `32px` / `2rem` | Large gaps |")
-    lines.append("| `--space-2xl` | `48px` / `3rem` | Section margins |")
-    lines.append("| `--space-3xl` | `64px` / `4rem` | Hero padding |")
-    lines.append("")
+    yield "### Spacing Variables"
+    yield ""
+    yield "| Token | Value | Usage |"
+    yield "|-------|-------|-------|"
+    yield "| `--space-xs` | `4px` / `0.25rem` | Tight gaps |"
+    yield "| `--space-sm` | `8px` / `0.5rem` | Icon gaps, inline spacing |"
+    yield "| `--space-md` | `16px` / `1rem` | Standard padding |"
+    yield "| `--space-lg` | `24px` / `1.5rem` | Section padding |"
+    yield "| `--space-xl` | `32px` / `2rem` | Large gaps |"
+    yield "| `--space-2xl` | `48px` / `3rem` | Section margins |"
+    yield "| `--space-3xl` | `64px` / `4rem` | Hero padding |"
+    yield ""
     
     # Shadow Depths
-    lines.append("### Shadow Depths")
-    lines.append("")
-    lines.append("| Level | Value | Usage |")
-    lines.append("|-------|-------|-------|")
-    lines.append("| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |")
-    lines.append("| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |")
-    lines.append("| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |")
-    lines.append("| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |")
-    lines.append("")
+    yield "### Shadow Depths"
+    yield ""
+    yield "| Level | Value | Usage |"
+    yield "|-------|-------|-------|"
+    yield "| `--shadow-sm` | `0 1px 2px rgba(0,0,0,0.05)` | Subtle lift |"
+    yield "| `--shadow-md` | `0 4px 6px rgba(0,0,0,0.1)` | Cards, buttons |"
+    yield "| `--shadow-lg` | `0 10px 15px rgba(0,0,0,0.1)` | Modals, dropdowns |"
+    yield "| `--shadow-xl` | `0 20px 25px rgba(0,0,0,0.15)` | Hero images, featured cards |"
+    yield ""
     
     # Component Specs section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Component Specs")
-    lines.append("")
+    yield "---"
+    yield ""
+    yield "## Component Specs"
+    yield ""
     
     # Buttons
-    lines.append("### Buttons")
-    lines.append("")
-    lines.append("```css")
-    lines.append("/* Primary Button */")
-    lines.append(".btn-primary {")
-    lines.append(f"  background: {colors.get('cta', '#F97316')};")
-    lines.append("  color: white;")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".btn-primary:hover {")
-    lines.append("  opacity: 0.9;")
-    lines.append("  transform: translateY(-1px);")
-    lines.append("}")
-    lines.append("")
-    lines.append("/* Secondary Button */")
-    lines.append(".btn-secondary {")
-    lines.append(f"  background: transparent;")
-    lines.append(f"  color: {colors.get('primary', '#2563EB')};")
-    lines.append(f"  border: 2px solid {colors.get('primary', '#2563EB')};")
-    lines.append("  padding: 12px 24px;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-weight: 600;")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
+    yield "### Buttons"
+    yield ""
+    yield "```css"
+    yield "/* Primary Button */"
+    yield ".btn-primary {"
+    yield f"  background: {colors.get('cta', '#F97316')};"
+    yield "  color: white;"
+    yield "  padding: 12px 24px;"
+    yield "  border-radius: 8px;"
+    yield "  font-weight: 600;"
+    yield "  transition: all 200ms ease;"
+    yield "  cursor: pointer;"
+    yield "}"
+    yield ""
+    yield ".btn-primary:hover {"
+    yield "  opacity: 0.9;"
+    yield "  transform: translateY(-1px);"
+    yield "}"
+    yield ""
+    yield "/* Secondary Button */"
+    yield ".btn-secondary {"
+    yield f"  background: transparent;"
+    yield f"  color: {colors.get('primary', '#2563EB')};"
+    yield f"  border: 2px solid {colors.get('primary', '#2563EB')};"
+    yield "  padding: 12px 24px;"
+    yield "  border-radius: 8px;"
+    yield "  font-weight: 600;"
+    yield "  transition: all 200ms ease;"
+    yield "  cursor: pointer;"
+    yield "}"
+    yield "```"
+    yield ""
     
     # Cards
-    lines.append("### Cards")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".card {")
-    lines.append(f"  background: {colors.get('background', '#FFFFFF')};")
-    lines.append("  border-radius: 12px;")
-    lines.append("  padding: 24px;")
-    lines.append("  box-shadow: var(--shadow-md);")
-    lines.append("  transition: all 200ms ease;")
-    lines.append("  cursor: pointer;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".card:hover {")
-    lines.append("  box-shadow: var(--shadow-lg);")
-    lines.append("  transform: translateY(-2px);")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
+    yield "### Cards"
+    yield ""
+    yield "```css"
+    yield ".card {"
+    yield f"  background: {colors.get('background', '#FFFFFF')};"
+    yield "  border-radius: 12px;"
+    yield "  padding: 24px;"
+    yield "  box-shadow: var(--shadow-md);"
+    yield "  transition: all 200ms ease;"
+    yield "  cursor: pointer;"
+    yield "}"
+    yield ""
+    yield ".card:hover {"
+    yield "  box-shadow: var(--shadow-lg);"
+    yield "  transform: translateY(-2px);"
+    yield "}"
+    yield "```"
+    yield ""
     
     # Inputs
-    lines.append("### Inputs")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".input {")
-    lines.append("  padding: 12px 16px;")
-    lines.append("  border: 1px solid #E2E8F0;")
-    lines.append("  border-radius: 8px;")
-    lines.append("  font-size: 16px;")
-    lines.append("  transition: border-color 200ms ease;")
-    lines.append("}")
-    lines.append("")
-    lines.append(".input:focus {")
-    lines.append(f"  border-color: {colors.get('primary', '#2563EB')};")
-    lines.append("  outline: none;")
-    lines.append(f"  box-shadow: 0 0 0 3px {colors.get('primary', '#2563EB')}20;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
+    yield "### Inputs"
+    yield ""
+    yield "```css"
+    yield ".input {"
+    yield "  padding: 12px 16px;"
+    yield "  border: 1px solid #E2E8F0;"
+    yield "  border-radius: 8px;"
+    yield "  font-size: 16px;"
+    yield "  transition: border-color 200ms ease;"
+    yield "}"
+    yield ""
+    yield ".input:focus {"
+    yield f"  border-color: {colors.get('primary', '#2563EB')};"
+    yield "  outline: none;"
+    yield f"  box-shadow: 0 0 0 3px {colors.get('primary', '#2563EB')}20;"
+    yield "}"
+    yield "```"
+    yield ""
     
     # Modals
-    lines.append("### Modals")
-    lines.append("")
-    lines.append("```css")
-    lines.append(".modal-overlay {")
-    lines.append("  background: rgba(0, 0, 0, 0.5);")
-    lines.append("  backdrop-filter: blur(4px);")
-    lines.append("}")
-    lines.append("")
-    lines.append(".modal {")
-    lines.append("  background: white;")
-    lines.append("  border-radius: 16px;")
-    lines.append("  padding: 32px;")
-    lines.append("  box-shadow: var(--shadow-xl);")
-    lines.append("  max-width: 500px;")
-    lines.append("  width: 90%;")
-    lines.append("}")
-    lines.append("```")
-    lines.append("")
+    yield "### Modals"
+    yield ""
+    yield "```css"
+    yield ".modal-overlay {"
+    yield "  background: rgba(0, 0, 0, 0.5);"
+    yield "  backdrop-filter: blur(4px);"
+    yield "}"
+    yield ""
+    yield ".modal {"
+    yield "  background: white;"
+    yield "  border-radius: 16px;"
+    yield "  padding: 32px;"
+    yield "  box-shadow: var(--shadow-xl);"
+    yield "  max-width: 500px;"
+    yield "  width: 90%;"
+    yield "}"
+    yield "```"
+    yield ""
     
     # Style section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Style Guidelines")
-    lines.append("")
-    lines.append(f"**Style:** {style.get('name', 'Minimalism')}")
-    lines.append("")
+    yield "---"
+    yield ""
+    yield "## Style Guidelines"
+    yield ""
+    yield f"**Style:** {style.get('name', 'Minimalism')}"
+    yield ""
     if style.get("keywords"):
-        lines.append(f"**Keywords:** {style.get('keywords', '')}")
-        lines.append("")
+        yield f"**Keywords:** {style.get('keywords', '')}"
+        yield ""
     if style.get("best_for"):
-        lines.append(f"**Best For:** {style.get('best_for', '')}")
-        lines.append("")
+        yield f"**Best For:** {style.get('best_for', '')}"
+        yield ""
     if effects:
-        lines.append(f"**Key Effects:** {effects}")
-        lines.append("")
+        yield f"**Key Effects:** {effects}"
+        yield ""
     
     # Layout Pattern
-    lines.append("### Page Pattern")
-    lines.append("")
-    lines.append(f"**Pattern Name:** {pattern.get('name', '')}")
-    lines.append("")
+    yield "### Page Pattern"
+    yield ""
+    yield f"**Pattern Name:** {pattern.get('name', '')}"
+    yield ""
     if pattern.get('conversion'):
-        lines.append(f"- **Conversion Strategy:** {pattern.get('conversion', '')}")
+        yield f"- **Conversion Strategy:** {pattern.get('conversion', '')}"
     if pattern.get('cta_placement'):
-        lines.append(f"- **CTA Placement:** {pattern.get('cta_placement', '')}")
-    lines.append(f"- **Section Order:** {pattern.get('sections', '')}")
-    lines.append("")
+        yield f"- **CTA Placement:** {pattern.get('cta_placement', '')}"
+    yield f"- **Section Order:** {pattern.get('sections', '')}"
+    yield ""
     
     # Anti-Patterns section
-    lines.append("---")
-    lines.append("")
-    lines.append("## Anti-Patterns (Do NOT Use)")
-    lines.append("")
+    yield "---"
+    yield ""
+    yield "## Anti-Patterns (Do NOT Use)"
+    yield ""
     if anti_patterns:
         anti_list = [a.strip() for a in anti_patterns.split("+")]
         for anti in anti_list:
             if anti:
-                lines.append(f"- ❌ {anti}")
-    lines.append("")
-    lines.append("### Additional Forbidden Patterns")
-    lines.append("")
-    lines.append("- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)")
-    lines.append("- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer")
-    lines.append("- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout")
-    lines.append("- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio")
-    lines.append("- ❌ **Instant state changes** — Always use transitions (150-300ms)")
-    lines.append("- ❌ **Invisible focus states** — Focus states must be visible for a11y")
-    lines.append("")
+                yield f"- ❌ {anti}"
+    yield ""
+    yield "### Additional Forbidden Patterns"
+    yield ""
+    yield "- ❌ **Emojis as icons** — Use SVG icons (Heroicons, Lucide, Simple Icons)"
+    yield "- ❌ **Missing cursor:pointer** — All clickable elements must have cursor:pointer"
+    yield "- ❌ **Layout-shifting hovers** — Avoid scale transforms that shift layout"
+    yield "- ❌ **Low contrast text** — Maintain 4.5:1 minimum contrast ratio"
+    yield "- ❌ **Instant state changes** — Always use transitions (150-300ms)"
+    yield "- ❌ **Invisible focus states** — Focus states must be visible for a11y"
+    yield ""
     
     # Pre-Delivery Checklist
-    lines.append("---")
-    lines.append("")
-    lines.append("## Pre-Delivery Checklist")
-    lines.append("")
-    lines.append("Before delivering any UI code, verify:")
-    lines.append("")
-    lines.append("- [ ] No emojis used as icons (use SVG instead)")
-    lines.append("- [ ] All icons from consistent icon set (Heroicons/Lucide)")
-    lines.append("- [ ] `cursor-pointer` on all clickable elements")
-    lines.append("- [ ] Hover states with smooth transitions (150-300ms)")
-    lines.append("- [ ] Light mode: text contrast 4.5:1 minimum")
-    lines.append("- [ ] Focus states visible for keyboard navigation")
-    lines.append("- [ ] `prefers-reduced-motion` respected")
-    lines.append("- [ ] Responsive: 375px, 768px, 1024px, 1440px")
-    lines.append("- [ ] No content hidden behind fixed navbars")
-    lines.append("- [ ] No horizontal scroll on mobile")
-    lines.append("")
+    yield "---"
+    yield ""
+    yield "## Pre-Delivery Checklist"
+    yield ""
+    yield "Before delivering any UI code, verify:"
+    yield ""
+    yield "- [ ] No emojis used as icons (use SVG instead)"
+    yield "- [ ] All icons from consistent icon set (Heroicons/Lucide)"
+    yield "- [ ] `cursor-pointer` on all clickable elements"
+    yield "- [ ] Hover states with smooth transitions (150-300ms)"
+    yield "- [ ] Light mode: text contrast 4.5:1 minimum"
+    yield "- [ ] Focus states visible for keyboard navigation"
+    yield "- [ ] `prefers-reduced-motion` respected"
+    yield "- [ ] Responsive: 375px, 768px, 1024px, 1440px"
+    yield "- [ ] No content hidden behind fixed navbars"
+    yield "- [ ] No horizontal scroll on mobile"
+    yield ""
     
-    return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
-    """Format a page-specific override file with intelligent AI-generated content."""
+@staged("format.master_md")
+def format_master_md(design_system: dict, timestamp: str = None) -> str:
+    """Format design system as MASTER.md with hierarchical override logic."""
+    return "\n".join(iter_master_md(design_system, timestamp))
+
+
+def iter_page_override_md(design_system: dict, page_name: str, page_query: str = None, search_fn=None,
+                          timestamp: str = None, overrides: dict = None):
+    """Yield a page override file line by line; overrides may come from plan_page_overrides()."""
     project = design_system.get("project_name", "PROJECT")
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = timestamp or _now()
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
-    
-    lines = []
+    page_overrides = overrides or _generate_intelligent_overrides(page_name, page_query, design_system, search_fn)
     
-    lines.append(f"# {page_title} Page Overrides")
-    lines.append("")
-    lines.append(f"> **PROJECT:** {project}")
-    lines.append(f"> **Generated:** {timestamp}")
-    lines.append(f"> **Page Type:** {page_overrides.get('page_type', 'General')}")
-    lines.append("")
-    lines.append("> ⚠️ **IMPORTANT:** Rules in this file **override** the Master file (`design-system/MASTER.md`).")
-    lines.append("> Only deviations from the Master are documented here. For all other rules, refer to the Master.")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
+    yield f"# {page_title} Page Overrides"
+    yield ""
+    yield f"> **PROJECT:** {project}"
+    yield f"> **Generated:** {timestamp}"
+    yield f"> **Page Type:** {page_overrides.get('page_type', 'General')}"
+    yield ""
+    yield "> ⚠️ **IMPORTANT:** Rules in this file **override** the Master file (`design-system/MASTER.md`)."
+    yield "> Only deviations from the Master are documented here. For all other rules, refer to the Master."
+    yield ""
+    yield "---"
+    yield ""
     
     # Page-specific rules with actual content
-    lines.append("## Page-Specific Rules")
-    lines.append("")
+    yield "## Page-Specific Rules"
+    yield ""
     
     # Layout Overrides
-    lines.append("### Layout Overrides")
-    lines.append("")
+    yield "### Layout Overrides"
+    yield ""
     layout = page_overrides.get("layout", {})
     if layout:
         for key, value in layout.items():
-            lines.append(f"- **{key}:** {value}")
+            yield f"- **{key}:** {value}"
     else:
-        lines.append("- No overrides — use Master layout")
-    lines.append("")
+        yield "- No overrides — use Master layout"
+    yield ""
     
     # Spacing Overrides
-    lines.append("### Spacing Overrides")
-    lines.append("")
+    yield "### Spacing Overrides"
+    yield ""
     spacing = page_overrides.get("spacing", {})
     if spacing:
         for key, value in spacing.items():
-            lines.append(f"- **{key}:** {value}")
+            yield f"- **{key}:** {value}"
     else:
-        lines.append("- No overrides — use Master spacing")
-    lines.append("")
+        yield "- No overrides — use Master spacing"
+    yield ""
     
     # Typography Overrides
-    lines.append("### Typography Overrides")
-    lines.append("")
+    yield "### Typography Overrides"
+    yield ""
     typography = page_overrides.get("typography", {})
     if typography:
         for key, value in typography.items():
-            lines.append(f"- **{key}:** {value}")
+            yield f"- **{key}:** {value}"
     else:
-        lines.append("- No overrides — use Master typography")
-    lines.append("")
+        yield "- No overrides — use Master typography"
+    yield ""
     
     # Color Overrides
-    lines.append("### Color Overrides")
-    lines.append("")
+    yield "### Color Overrides"
+    yield ""
     colors = page_overrides.get("colors", {})
     if colors:
         for key, value in colors.items():
-            lines.append(f"- **{key}:** {value}")
+            yield f"- **{key}:** {value}"
     else:
-        lines.append("- No overrides — use Master colors")
-    lines.append("")
+        yield "- No overrides — use Master colors"
+    yield ""
     
     # Component Overrides
-    lines.append("### Component Overrides")
-    lines.append("")
+    yield "### Component Overrides"
+    yield ""
     components = page_overrides.get("components", [])
     if components:
         for comp in components:
-            lines.append(f"- {comp}")
+            yield f"- {comp}"
     else:
-        lines.append("- No overrides — use Master component specs")
-    lines.append("")
+        yield "- No overrides — use Master component specs"
+    yield ""
     
     # Page-Specific Components
-    lines.append("---")
-    lines.append("")
-    lines.append("## Page-Specific Components")
-    lines.append("")
+    yield "---"
+    yield ""
+    yield "## Page-Specific Components"
+    yield ""
     unique_components = page_overrides.get("unique_components", [])
     if unique_components:
         for comp in unique_components:
-            lines.append(f"- {comp}")
+            yield f"- {comp}"
     else:
-        lines.append("- No unique components for this page")
-    lines.append("")
+        yield "- No unique components for this page"
+    yield ""
     
     # Recommendations
-    lines.append("---")
-    lines.append("")
-    lines.append("## Recommendations")
-    lines.append("")
+    yield "---"
+    yield ""
+    yield "## Recommendations"
+    yield ""
     recommendations = page_overrides.get("recommendations", [])
     if recommendations:
         for rec in recommendations:
-            lines.append(f"- {rec}")
-    lines.append("")
+            yield f"- {rec}"
+    yield ""
     
-    return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+@staged("format.page_override_md")
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None, search_fn=None,
+                            timestamp: str = None, overrides: dict = None) -> str:
+    """Format a page-specific override file with intelligent AI-generated content."""
+    return "\n".join(iter_page_override_md(design_system, page_name, page_query, search_fn, timestamp, overrides))
+
+
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict, search_fn=None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
     data instead of hardcoded page types.
     """
-    from core import search
-    
-    page_lower = page_name.lower()
-    query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
-    
-    # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
-    
-    # Extract results from search response
-    style_results = style_search.get("results", [])
-    ux_results = ux_search.get("results", [])
-    landing_results = landing_search.get("results", [])
-    
-    # Detect page type from search results or context
-    page_type = _detect_page_type(combined_context, style_results)
-    
+    return plan_page_overrides([(page_name, page_query)], search_fn)[(page_name, page_query)]
+
+
+# ============ PAGE OVERRIDE PLANNING ============
+# Searches behind every page override: (domain, max_results)
+PAGE_SEARCHES = (("style", 1), ("ux", 3), ("landing", 1))
+
+# Page type patterns in priority order; the first pattern with a keyword in the context wins
+PAGE_PATTERNS = [
+    (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
+    (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
+    (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
+    (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
+    (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
+    (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
+    (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
+    (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
+    (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
+    (["empty", "404", "error", "not found", "zero"], "Empty State"),
+]
+
+_PAGE_TYPE_INDEX = _SubstringIndex({
+    keyword: rank for rank, (keywords, _) in reversed(list(enumerate(PAGE_PATTERNS))) for keyword in keywords
+})
+# A keyword spanning "<page> <query>" lies within this many characters either side of the space
+_PAGE_KEYWORD_SPAN = max(len(keyword) for keywords, _ in PAGE_PATTERNS for keyword in keywords) - 1
+
+
+@lru_cache(maxsize=4096)
+def _page_type_rank(text: str):
+    """Index of the first page pattern with a keyword in text (lowercased), or None."""
+    return _PAGE_TYPE_INDEX.min_match(text)
+
+
+def _context_rank(page_lower: str, query_lower: str):
+    """_page_type_rank of f"{page_lower} {query_lower}", reusing the cached page and query ranks."""
+    boundary = f"{page_lower[-_PAGE_KEYWORD_SPAN:]} {query_lower[:_PAGE_KEYWORD_SPAN]}"
+    ranks = [rank for rank in (_page_type_rank(page_lower), _page_type_rank(query_lower),
+                               _PAGE_TYPE_INDEX.min_match(boundary)) if rank is not None]
+    return min(ranks) if ranks else None
+
+
+@staged("page_overrides")
+def plan_page_overrides(pages, search_fn=None) -> dict:
+    """
+    Overrides for many pages of one project in a single pass.
+
+    pages: iterable of (page_name, page_query). Page types come from the
+    cached keyword ranks, and the style/UX/landing lookups of all pages are
+    deduplicated and run one domain at a time. Returns
+    {(page_name, page_query): overrides}.
+    """
+    contexts = {}
+    for page_name, page_query in pages:
+        contexts[(page_name, page_query)] = (page_name.lower(), (page_query or "").lower())
+
+    # Domain-major order so each CSV's index is loaded once and then stays hot
+    search_fn = search_fn or search
+    results = {}
+    for domain, max_results in PAGE_SEARCHES:
+        for page_lower, query_lower in contexts.values():
+            request = (f"{page_lower} {query_lower}", domain, max_results)
+            if request not in results:
+                results[request] = search_fn(*request)
+
+    plans = {}
+    for key, (page_lower, query_lower) in contexts.items():
+        combined_context = f"{page_lower} {query_lower}"
+        style_results, ux_results, landing_results = (
+            results[(combined_context, domain, max_results)].get("results", [])
+            for domain, max_results in PAGE_SEARCHES
+        )
+        page_type = _page_type_from_rank(_context_rank(page_lower, query_lower), style_results)
+        plans[key] = _build_page_overrides(page_type, style_results, ux_results, landing_results)
+    return plans
+
+
+def _build_page_overrides(page_type: str, style_results: list, ux_results: list, landing_results: list) -> dict:
+    """Turn one page's style, UX and landing results into its overrides."""
     # Build overrides from search results
     layout = {}
     spacing = {}
@@ -1019,25 +1843,13 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
 
 def _detect_page_type(context: str, style_results: list) -> str:
     """Detect page type from context and search results."""
-    context_lower = context.lower()
-    
-    # Check for common page type patterns
-    page_patterns = [
-        (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
-        (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
-        (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
-        (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
-        (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
-        (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
-        (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
-        (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
-        (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
-        (["empty", "404", "error", "not found", "zero"], "Empty State"),
-    ]
-    
-    for keywords, page_type in page_patterns:
-        if any(kw in context_lower for kw in keywords):
-            return page_type
+    return _page_type_from_rank(_page_type_rank(context.lower()), style_results)
+
+
+def _page_type_from_rank(rank, style_results: list) -> str:
+    """Page type for a pattern rank, falling back to the top style result."""
+    if rank is not None:
+        return PAGE_PATTERNS[rank][1]
     
     # Fallback: try to infer from style results
     if style_results:
@@ -1063,5 +1875,5 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    result = generate_design_system(args.query, args.project_name, args.format)
-    print(result)
+    import sys
+    generate_design_system(args.query, args.project_name, args.format, out=sys.stdout)
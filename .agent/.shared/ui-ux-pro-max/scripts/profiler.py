@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Profiler - Opt-in per-stage wall time and call counts
+
+Instrumented code marks stages with `stage(name)` (a context manager) or the
+`@staged(name)` decorator. Both cost a single global lookup while no profile
+is active. Stages nest per thread; stages entered on worker threads are
+rooted under a "[thread-name]" frame.
+
+Usage:
+    from profiler import profile
+    with profile() as prof:
+        generate_design_system("SaaS dashboard")
+    print(prof.to_json())                # per-stage calls, total and self time
+    prof.write("out.folded", "collapsed")  # flamegraph.pl / speedscope input
+
+    python search.py "SaaS dashboard" --design-system --profile profile.json
+    python search.py "SaaS dashboard" --design-system --profile out.folded --profile-format collapsed
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+# ============ STAGES ============
+# The running Profiler, or None when profiling is off
+_active = None
+
+
+class _NullStage:
+    """Stand-in returned by stage() while no profile is active."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """One timed entry of a stage; records its full stack path on exit."""
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._profiler._stack().append(self._name)
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self._start
+        stack = self._profiler._stack()
+        self._profiler._record(tuple(stack), elapsed)
+        stack.pop()
+        return False
+
+
+def stage(name: str):
+    """Context manager timing the enclosed block as `name` when a profile is active."""
+    profiler = _active
+    return _NULL_STAGE if profiler is None else _Stage(profiler, name)
+
+
+def staged(name: str):
+    """Decorator timing every call of a function as `name` when a profile is active."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with _Stage(profiler, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ============ PROFILER ============
+class Profiler:
+    """Call counts and wall time per stage path, collected across threads."""
+
+    def __init__(self):
+        self._thread = threading.current_thread()
+        self._stacks = threading.local()
+        self._lock = threading.Lock()
+        self._paths = {}
+        self._started = time.perf_counter_ns()
+        self._stopped = None
+
+    def _stack(self) -> list:
+        stack = getattr(self._stacks, "stack", None)
+        if stack is None:
+            thread = threading.current_thread()
+            stack = self._stacks.stack = [] if thread is self._thread else [f"[{thread.name}]"]
+        return stack
+
+    def _record(self, path: tuple, elapsed: int):
+        with self._lock:
+            entry = self._paths.get(path)
+            if entry is None:
+                self._paths[path] = [1, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+
+    def _snapshot(self) -> tuple:
+        """({path: (calls, total_ns)}, {path: self_ns}) at this moment."""
+        with self._lock:
+            paths = {path: tuple(entry) for path, entry in self._paths.items()}
+        self_ns = {path: total for path, (_, total) in paths.items()}
+        for path, (_, total) in paths.items():
+            if path[:-1] in self_ns:
+                self_ns[path[:-1]] -= total
+        return paths, self_ns
+
+    def to_dict(self) -> dict:
+        """
+        wall_ms of the profile, per-stage totals ("stages", by name across all
+        paths, heaviest first) and per-path detail ("stacks").
+        """
+        paths, self_ns = self._snapshot()
+        stages = {}
+        for path, (calls, total) in paths.items():
+            name = path[-1]
+            entry = stages.setdefault(name, [0, 0, 0])
+            entry[0] += calls
+            entry[2] += self_ns[path]
+            # A stage nested in itself is only counted at its outermost level
+            if name not in path[:-1]:
+                entry[1] += total
+
+        wall = (self._stopped or time.perf_counter_ns()) - self._started
+        return {
+            "wall_ms": _ms(wall),
+            "stages": {
+                name: {"calls": calls, "total_ms": _ms(total), "self_ms": _ms(own)}
+                for name, (calls, total, own) in sorted(stages.items(), key=lambda item: -item[1][1])
+            },
+            "stacks": [
+                {"stack": ";".join(path), "calls": calls, "total_ms": _ms(total), "self_ms": _ms(self_ns[path])}
+                for path, (calls, total) in sorted(paths.items())
+            ]
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+
+    def collapsed(self) -> str:
+        """Collapsed stacks ("a;b;c <self microseconds>" per line) for flame graph tools."""
+        _, self_ns = self._snapshot()
+        lines = [f"{';'.join(path)} {own // 1000}" for path, own in sorted(self_ns.items()) if own >= 1000]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, path: str, fmt: str = "json"):
+        """Write the profile as "json" or "collapsed" to path ("-" for stderr)."""
+        content = self.collapsed() if fmt == "collapsed" else self.to_json() + "\n"
+        if path == "-":
+            sys.stderr.write(content)
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+def _ms(ns: int) -> float:
+    return round(ns / 1e6, 3)
+
+
+# ============ ACTIVATION ============
+def enable() -> Profiler:
+    """Start recording into a new Profiler and return it."""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def disable():
+    """Stop recording; returns the Profiler that was active, if any."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None and profiler._stopped is None:
+        profiler._stopped = time.perf_counter_ns()
+    return profiler
+
+
+@contextmanager
+def profile():
+    """Record every stage run inside the block; yields the Profiler."""
+    global _active
+    previous = _active
+    profiler = enable()
+    try:
+        yield profiler
+    finally:
+        disable()
+        _active = previous
@@ -3,20 +3,61 @@
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --all [--max-results 5]
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --batch queries.jsonl      (or --batch - for stdin)
+       python search.py --design-system --batch briefs.jsonl [-o OUTPUT_DIR]
+       python search.py --rebuild-index [--build-snapshots]
+       python search.py --serve [--socket PATH | --stdio]
+       python search.py "<query>" --daemon [...]
+       python search.py "<query>" --design-system --profile profile.json [--profile-format collapsed]
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
+Without --domain, the query is routed to the best-scoring domain of the unified index;
+--all returns the best hits across every domain and stack instead.
 Stacks: html-tailwind, react, nextjs
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+
+Batch (JSON-lines in, JSON-lines out):
+  --batch FILE Each line: {"query": ..., "domain": ..., "stack": ..., "max_results": ...}
+               ("domain": "all" runs a cross-domain search)
+               Queries are grouped per domain/stack; each output line is
+               {"index": <input line number, 0-based>, "id": <optional input id>, "result": {...}};
+               a malformed line (bad JSON or field types) gets {"index": ..., "error": "..."}
+  --design-system --batch FILE
+               Each line is a brief: {"query": ..., "project_name": ..., "pages": ["dashboard", ...],
+               "output_dir": ...}; pages may also be {"name": ..., "query": ...}.
+               Every brief is persisted (MASTER.md + page overrides); each output line
+               reports its files and timings_ms (generate, render, write, total)
+
+Indexing:
+  Each CSV is compiled once into .index/ and reused until the CSV changes.
+  --rebuild-index  Force a rebuild of every domain and stack index
+  --build-snapshots
+               Precompute the design system of every products.csv category into
+               .index/design-snapshots.json; --design-system queries that name a
+               category are answered from it until a CSV changes
+
+Profiling:
+  --profile FILE   Record wall time and call counts per pipeline stage (CSV parsing,
+                   index loads, BM25 fit/score, reasoning, rendering, ...) to FILE
+                   ('-' for stderr) when the command finishes
+  --profile-format json (per-stage and per-stack totals) or collapsed (flame graph input)
+
+Daemon (keeps all indexes warm between lookups):
+  --serve      Serve JSON-lines requests on a Unix socket (or stdin/stdout with --stdio)
+  --daemon     Ask the running daemon; falls back to in-process search if none is running
 """
 
+# design_system and json are imported only by the modes that use them; see benchmarks/startup.py
 import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+import os
+import sys
+from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack, search_all, search_batch, parse_batch_request, build_indexes
 
 
 def format_output(result):
@@ -45,13 +86,84 @@ def format_output(result):
     return "\n".join(output)
 
 
+def run_batch(lines, out):
+    """Stream JSON-lines results for JSON-lines search requests, in input order."""
+    import json
+
+    order, requests, ids, ready = [], [], [], {}
+    for position, line in enumerate(lines):
+        if not line.strip():
+            continue
+        order.append(position)
+        try:
+            request = json.loads(line)
+            parse_batch_request(request)
+        except ValueError as e:
+            ready[position] = {"index": position, "error": f"Invalid request: {e}"}
+            continue
+        requests.append(request)
+        ids.append((position, request.get("id")))
+
+    # search_batch yields by target CSV; hold records back until every earlier line is written
+    written = 0
+
+    def flush():
+        nonlocal written
+        while written < len(order) and order[written] in ready:
+            out.write(json.dumps(ready.pop(order[written]), ensure_ascii=False) + "\n")
+            written += 1
+        out.flush()
+
+    flush()
+    for i, result in search_batch(requests):
+        position, request_id = ids[i]
+        record = {"index": position, "result": result}
+        if request_id is not None:
+            record["id"] = request_id
+        ready[position] = record
+        flush()
+
+
+def run_design_batch(lines, out, output_dir=None):
+    """Persist a design system per JSON-lines brief, streaming one JSON-lines record per brief."""
+    import json
+    import time
+    from design_system import generate_design_systems
+
+    started = time.perf_counter()
+    briefs, positions = [], []
+    for position, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            brief = json.loads(line)
+        except ValueError as e:
+            # Passed through so its error record keeps its place in the output
+            brief = ValueError(f"Invalid brief: {e}")
+        briefs.append(brief)
+        positions.append(position)
+
+    stats, pages, errors = {}, 0, 0
+    for record in generate_design_systems(briefs, output_dir, stats=stats):
+        record["index"] = positions[record["index"]]
+        errors += "error" in record
+        pages += max(0, len(record.get("created_files", [])) - 1)
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    print(f"{len(briefs)} briefs ({errors} errors), {pages} pages in {time.perf_counter() - started:.2f}s; "
+          f"{stats.get('searches', 0)} searches run, {stats.get('deduplicated', 0)} deduplicated", file=sys.stderr)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
+    parser.add_argument("--all", "-a", action="store_true", help="Search every domain and stack in one pass")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--batch", type=str, default=None, metavar="FILE", help="Run JSON-lines search requests from FILE ('-' for stdin), streaming JSON-lines results")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
@@ -60,20 +172,85 @@ if __name__ == "__main__":
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Index maintenance
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild the on-disk search index for every domain and stack")
+    parser.add_argument("--build-snapshots", action="store_true", help="Precompute design systems for every product category")
+    # Profiling
+    parser.add_argument("--profile", type=str, default=None, metavar="FILE", help="Write a per-stage timing profile to FILE ('-' for stderr)")
+    parser.add_argument("--profile-format", choices=["json", "collapsed"], default="json", help="Profile output: JSON breakdown or collapsed stacks for flame graphs")
+    # Daemon mode
+    parser.add_argument("--serve", action="store_true", help="Run as a long-lived search daemon with warm indexes")
+    parser.add_argument("--stdio", action="store_true", help="With --serve: speak JSON-lines on stdin/stdout instead of a socket")
+    parser.add_argument("--socket", type=str, default=None, help="Daemon Unix socket path (default: per-user socket in the temp dir)")
+    parser.add_argument("--daemon", action="store_true", help="Query the running daemon, falling back to in-process search")
 
     args = parser.parse_args()
 
+    if args.profile:
+        import atexit
+        from profiler import enable
+        # Written on exit, since several modes below end with SystemExit
+        atexit.register(enable().write, args.profile, args.profile_format)
+
+    if args.serve:
+        from daemon import serve_socket, serve_stdio
+        if args.stdio:
+            serve_stdio()
+        else:
+            serve_socket(args.socket)
+        raise SystemExit(0)
+
+    if args.rebuild_index:
+        indexed = build_indexes(force=True)
+        print(f"Rebuilt {len(indexed)} indexes")
+    if args.build_snapshots:
+        from design_system import build_snapshots
+        print(f"Built {build_snapshots()} design-system snapshots")
+    if (args.rebuild_index or args.build_snapshots) and not args.query and not args.batch:
+        raise SystemExit(0)
+
+    if args.batch:
+        if args.design_system:
+            def runner(lines, out):
+                run_design_batch(lines, out, args.output_dir)
+        else:
+            runner = run_batch
+        if args.batch == "-":
+            runner(sys.stdin, sys.stdout)
+        else:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                runner(f, sys.stdout)
+        raise SystemExit(0)
+
+    if not args.query:
+        parser.error("the following arguments are required: query")
+
     # Design system takes priority
     if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
-        )
-        print(result)
+        if args.daemon:
+            from daemon import query as daemon_query
+            result = daemon_query({
+                "op": "design_system",
+                "query": args.query,
+                "project_name": args.project_name,
+                "format": args.format,
+                "persist": args.persist,
+                "page": args.page,
+                "output_dir": args.output_dir or os.getcwd()
+            }, args.socket)
+            print(result)
+        else:
+            # Streams the rendered system to stdout as it is produced
+            from design_system import generate_design_system
+            generate_design_system(
+                args.query, 
+                args.project_name, 
+                args.format,
+                persist=args.persist,
+                page=args.page,
+                output_dir=args.output_dir,
+                out=sys.stdout
+            )
         
         # Print persistence confirmation
         if args.persist:
@@ -90,7 +267,23 @@ if __name__ == "__main__":
             print("=" * 60)
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        if args.daemon:
+            from daemon import query as daemon_query
+            result = daemon_query({"op": "search_stack", "query": args.query, "stack": args.stack, "max_results": args.max_results}, args.socket)
+        else:
+            result = search_stack(args.query, args.stack, args.max_results)
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
+    # Cross-domain search
+    elif args.all:
+        if args.daemon:
+            from daemon import query as daemon_query
+            result = daemon_query({"op": "search_all", "query": args.query, "max_results": args.max_results}, args.socket)
+        else:
+            result = search_all(args.query, args.max_results)
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -98,7 +291,11 @@ if __name__ == "__main__":
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        if args.daemon:
+            from daemon import query as daemon_query
+            result = daemon_query({"op": "search", "query": args.query, "domain": args.domain, "max_results": args.max_results}, args.socket)
+        else:
+            result = search(args.query, args.domain, args.max_results)
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch Mode Tests - search_batch and search.py --batch keep going past
+malformed requests and report each one on its own line, in input order.
+
+Usage: python -m unittest discover .agent/.shared/ui-ux-pro-max/tests
+"""
+
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import core  # noqa: E402
+from search import run_batch  # noqa: E402
+
+MIXED_LINES = [
+    '{"query": "glassmorphism", "domain": "style", "id": "good-1"}\n',
+    '{"query": "glassmorphism", "max_results": "abc"}\n',
+    '{"query": "forms", "stack": ["react"]}\n',
+    '\n',
+    '{"query": "forms", "stack": "react", "max_results": "2"}\n',
+    'not json\n',
+    '["a list"]\n',
+    '{"query": 42}\n',
+    '{"query": "dark dashboard", "domain": {"name": "style"}}\n',
+    '{"query": "forms", "max_results": -1}\n',
+    '{"query": "fintech", "domain": "all", "max_results": 2}\n',
+]
+
+
+class SearchBatchTest(unittest.TestCase):
+
+    def test_malformed_requests_yield_errors(self):
+        requests = [
+            {"query": "glassmorphism", "domain": "style"},
+            {"query": "glassmorphism", "max_results": "abc"},
+            {"query": "forms", "stack": ["react"]},
+            "not a dict",
+            {"query": "forms", "stack": "react", "max_results": 2},
+        ]
+        results = dict(core.search_batch(requests))
+        self.assertEqual(sorted(results), [0, 1, 2, 3, 4])
+        for position in (1, 2, 3):
+            self.assertTrue(results[position]["error"].startswith("Invalid request: "))
+        self.assertEqual(results[0]["domain"], "style")
+        self.assertNotIn("error", results[4])
+        self.assertEqual(results[4]["count"], 2)
+
+    def test_parse_batch_request_converts_fields(self):
+        self.assertEqual(core.parse_batch_request({"query": "forms", "max_results": "5"}),
+                         ("forms", None, None, 5))
+        self.assertEqual(core.parse_batch_request({}), ("", None, None, core.MAX_RESULTS))
+        for request in ({"max_results": 0.5}, {"max_results": [3]}, {"stack": 1}, {"domain": ["style"]},
+                        {"max_results": 0}, {"max_results": ""}, {"max_results": False}):
+            with self.assertRaises(ValueError):
+                core.parse_batch_request(request)
+
+
+class RunBatchTest(unittest.TestCase):
+
+    def test_mixed_batch_reports_every_line(self):
+        out = io.StringIO()
+        run_batch(MIXED_LINES, out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([record["index"] for record in lines], [0, 1, 2, 4, 5, 6, 7, 8, 9, 10])
+        records = {record["index"]: record for record in lines}
+
+        for index in (1, 2, 5, 6, 7, 8, 9):
+            self.assertIn("error", records[index])
+            self.assertNotIn("result", records[index])
+        self.assertIn("max_results", records[1]["error"])
+        self.assertIn("stack", records[2]["error"])
+
+        self.assertEqual(records[0]["id"], "good-1")
+        self.assertEqual(records[0]["result"]["domain"], "style")
+        self.assertEqual(records[4]["result"]["stack"], "react")
+        self.assertEqual(records[4]["result"]["count"], 2)
+        self.assertEqual(records[10]["result"]["domain"], "all")
+
+
+if __name__ == "__main__":
+    unittest.main()
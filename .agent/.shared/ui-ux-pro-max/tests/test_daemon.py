@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Daemon Tests - query() falls back to in-process search only when no
+daemon can be connected to, never after the request has been sent, and
+execute() only defaults max_results when it is missing.
+
+Usage: python -m unittest discover .agent/.shared/ui-ux-pro-max/tests
+"""
+
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import daemon  # noqa: E402
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+class QueryFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = Path(self.tmp.name) / "daemon.sock"
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_unreachable_daemon_falls_back(self):
+        # A stale socket file with nothing listening behind it
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(self.socket_path))
+        stale.close()
+        with mock.patch.object(daemon, "execute", return_value="local") as execute:
+            self.assertEqual(daemon.query({"op": "ping"}, self.socket_path), "local")
+        execute.assert_called_once()
+
+    def test_timeout_after_send_is_not_retried(self):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(self.socket_path))
+        server.listen(1)
+        self.addCleanup(server.close)
+        received = []
+
+        def accept_and_stall():
+            conn, _ = server.accept()
+            with conn:
+                received.append(conn.recv(4096))
+                conn.recv(1)  # returns once the client gives up
+
+        thread = threading.Thread(target=accept_and_stall, daemon=True)
+        thread.start()
+        with mock.patch.object(daemon, "CLIENT_TIMEOUT", 0.2), \
+                mock.patch.object(daemon, "execute") as execute:
+            with self.assertRaises(RuntimeError):
+                daemon.query({"op": "design_system", "query": "saas", "persist": True}, self.socket_path)
+        thread.join(5)
+        execute.assert_not_called()
+        self.assertIn(b'"persist": true', received[0])
+
+
+
+class ExecuteTest(unittest.TestCase):
+
+    def test_max_results_defaults_only_when_missing(self):
+        with mock.patch.object(daemon.core, "search", return_value={}) as search:
+            daemon.execute({"query": "dark", "domain": "style"})
+            daemon.execute({"query": "dark", "domain": "style", "max_results": "1"})
+        self.assertEqual([c.args[2] for c in search.call_args_list], [daemon.core.MAX_RESULTS, 1])
+        for max_results in (0, -1, False):
+            response = daemon.handle_request({"query": "glassmorphism", "max_results": max_results})
+            self.assertFalse(response["ok"])
+            self.assertIn("max_results", response["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
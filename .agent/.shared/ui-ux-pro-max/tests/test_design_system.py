@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Design System Tests - reasoning rules are copied out of the shared index
+without assuming the shape of their Decision_Rules JSON, typo-tolerant
+style matching never overrides an exact match, and search.py --design-system --batch reports every brief, in input order,
+past malformed ones.
+
+Usage: python -m unittest discover .agent/.shared/ui-ux-pro-max/tests
+"""
+
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from design_system import DesignSystemGenerator, _ReasoningIndex, _parse_brief  # noqa: E402
+from search import run_design_batch  # noqa: E402
+
+
+class ApplyReasoningTest(unittest.TestCase):
+
+    def _generator(self, decision_rules_json):
+        generator = DesignSystemGenerator(snapshots=False)
+        generator._reasoning_index = _ReasoningIndex([
+            {"UI_Category": "Fintech", "Style_Priority": "Minimalism", "Decision_Rules": decision_rules_json}
+        ])
+        return generator
+
+    def test_object_rules_are_copied(self):
+        generator = self._generator('{"if_dark": "use-contrast"}')
+        reasoning = generator._apply_reasoning("Fintech", {})
+        self.assertEqual(reasoning["decision_rules"], {"if_dark": "use-contrast"})
+        reasoning["decision_rules"]["extra"] = True
+        self.assertNotIn("extra", generator._apply_reasoning("Fintech", {})["decision_rules"])
+
+    def test_non_object_rules_pass_through(self):
+        for raw, expected in (('["a", "b"]', ["a", "b"]), ('"plain"', "plain"), ('3', 3)):
+            reasoning = self._generator(raw)._apply_reasoning("Fintech", {})
+            self.assertEqual(reasoning["decision_rules"], expected)
+
+
+class SelectBestMatchTest(unittest.TestCase):
+
+    RESULTS = [{"Style Category": "Glassmorphism"}, {"Style Category": "Minimalism & Swiss Style"}]
+
+    def test_exact_match_beats_earlier_typo(self):
+        generator = DesignSystemGenerator(snapshots=False)
+        match = generator._select_best_match(self.RESULTS, ["Glasmorphism", "Minimalism"])
+        self.assertEqual(match["Style Category"], "Minimalism & Swiss Style")
+
+    def test_typo_matches_when_nothing_exact_does(self):
+        generator = DesignSystemGenerator(snapshots=False)
+        match = generator._select_best_match(self.RESULTS, ["Glasmorphism", "Brutalism"])
+        self.assertEqual(match["Style Category"], "Glassmorphism")
+
+
+class DesignBatchTest(unittest.TestCase):
+
+    def test_parse_brief_rejects_malformed_fields(self):
+        for brief in ({"query": "x", "project_name": 5}, {"query": "x", "output_dir": ["a"]},
+                      {"query": "x", "pages": "abc"}, {"query": "x", "pages": {"name": "a"}}):
+            with self.assertRaises(ValueError):
+                _parse_brief(brief)
+        with self.assertRaisesRegex(ValueError, "pages"):
+            _parse_brief({"query": "x", "pages": "abc"})
+
+    def test_records_follow_input_order(self):
+        lines = [
+            '{"query": "SaaS dashboard", "project_name": "Alpha", "id": "a"}\n',
+            '{"query": "x", "project_name": 5}\n',
+            'not json\n',
+            '\n',
+            '{"query": "x", "pages": "abc"}\n',
+            '{"query": "fintech app", "project_name": "Beta", "pages": ["checkout"]}\n',
+        ]
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as output_dir:
+            run_design_batch(lines, out, output_dir)
+            records = [json.loads(line) for line in out.getvalue().splitlines()]
+            self.assertEqual(list(Path(output_dir).rglob("a.md")), [])
+
+        self.assertEqual([record["index"] for record in records], [0, 1, 2, 4, 5])
+        self.assertEqual(records[0]["id"], "a")
+        self.assertNotIn("error", records[0])
+        self.assertIn("project_name", records[1]["error"])
+        self.assertIn("Invalid brief", records[2]["error"])
+        self.assertIn("pages", records[3]["error"])
+        self.assertNotIn("error", records[4])
+        self.assertEqual(len(records[4]["created_files"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Routing Tests - detect_domain weighs DOMAIN_KEYWORDS matches on top of
+unified-index scores, so a domain named by keyword wins even when none of
+its documents match the query.
+
+Usage: python -m unittest discover .agent/.shared/ui-ux-pro-max/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import core  # noqa: E402
+
+
+class _FakeUnified:
+
+    def __init__(self, scores):
+        self.scores = scores
+
+    def best_scores(self, query):
+        return self.scores
+
+
+class DetectDomainTest(unittest.TestCase):
+
+    def _route(self, query, scores):
+        with mock.patch.object(core, "_get_unified", return_value=_FakeUnified(scores)):
+            return core.detect_domain(query)
+
+    def test_keyword_only_domain_beats_weak_hit(self):
+        self.assertEqual(self._route("lucide icons", {"web": 7.6, "prompt": 6.5}), "icons")
+
+    def test_keyword_breaks_score_tie(self):
+        self.assertEqual(self._route("font pairing", {"prompt": 6.75}), "typography")
+
+    def test_strong_hit_without_keywords_still_wins(self):
+        self.assertEqual(self._route("frosted panels", {"style": 9.0, "color": 2.0}), "style")
+
+    def test_keywords_decide_when_nothing_matches(self):
+        self.assertEqual(self._route("chart", {}), "chart")
+        self.assertEqual(self._route("nothing relevant", {}), "style")
+
+    def test_real_index_routes_keyword_queries(self):
+        self.assertEqual(core.detect_domain("lucide icons"), "icons")
+        self.assertEqual(core.detect_domain("react suspense"), "react")
+
+
+if __name__ == "__main__":
+    unittest.main()
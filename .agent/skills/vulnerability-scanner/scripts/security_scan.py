@@ -4,8 +4,15 @@ Skill: vulnerability-scanner
 Script: security_scan.py
 Purpose: Validate that security principles from SKILL.md are applied correctly
 Usage: python security_scan.py <project_path> [--scan-type all|deps|secrets|patterns|config]
+                                [--since <git-ref>] [--no-cache] [--jobs N]
 Output: JSON with validation findings
 
+Findings per file are cached in <project>/.agent/cache/security_scan.sqlite;
+unchanged files are served from the cache on the next run (--no-cache to
+rescan everything). --since limits the scan to files changed since a git ref.
+Files are scanned on --jobs worker processes (default: CPU count); findings
+are merged in path order, so output doesn't depend on the job count.
+
 This script verifies:
 1. Dependencies - Supply chain security (OWASP A03)
 2. Secrets - No hardcoded credentials (OWASP A04)
@@ -13,13 +20,20 @@ This script verifies:
 4. Configuration - Security settings validated (OWASP A02)
 """
 import subprocess
+import hashlib
 import json
 import os
 import sys
 import re
+import sqlite3
+import time
 import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, NamedTuple, Optional, Tuple
 from datetime import datetime
 
 # Fix Windows console encoding for Unicode output
@@ -85,9 +99,416 @@ DANGEROUS_PATTERNS = [
     (r'yaml\.load\s*\([^)]*\)(?!\s*,\s*Loader)', "Unsafe YAML load", "high", "Deserialization risk"),
 ]
 
+CONFIG_PATTERNS = [
+    (r'"DEBUG"\s*:\s*true', "Debug mode enabled", "high"),
+    (r'debug\s*=\s*True', "Debug mode enabled", "high"),
+    (r'NODE_ENV.*development', "Development mode in config", "medium"),
+    (r'"CORS_ALLOW_ALL".*true', "CORS allow all origins", "high"),
+    (r'"Access-Control-Allow-Origin".*\*', "CORS wildcard", "high"),
+    (r'allowCredentials.*true.*origin.*\*', "Dangerous CORS combo", "critical"),
+]
+
 SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '__pycache__', '.venv', 'venv', '.next'}
 CODE_EXTENSIONS = {'.js', '.ts', '.jsx', '.tsx', '.py', '.go', '.java', '.rb', '.php'}
 CONFIG_EXTENSIONS = {'.json', '.yaml', '.yml', '.toml', '.env', '.env.local', '.env.development'}
+CONFIG_FILES = {'next.config.js', 'webpack.config.js', '.eslintrc.js'}
+
+# Process pool: files per batch sent to a worker, and the fewest files worth a pool
+BATCH_FILES = 256
+PARALLEL_MIN_FILES = 200
+
+# Lowercase literals per pattern name: every match contains at least one of
+# them, so text containing none is never run through that pattern's regex.
+PATTERN_LITERALS = {
+    # SECRET_PATTERNS
+    "API Key": ("api",),
+    "Token": ("token",),
+    "Bearer Token": ("bearer",),
+    "AWS Access Key": ("akia",),
+    "AWS Secret": ("secret",),
+    "Azure Credential": ("azure",),
+    "GCP Credential": ("google",),
+    "Password": ("password",),
+    "Database Connection String": ("://",),
+    "Private Key": ("-----begin",),
+    "SSH Key": ("ssh-rsa",),
+    "JWT Token": ("eyj",),
+    # DANGEROUS_PATTERNS
+    "eval() usage": ("eval",),
+    "exec() usage": ("exec",),
+    "Function constructor": ("function",),
+    "child_process.exec": ("child_process.exec",),
+    "subprocess with shell=True": ("subprocess.call",),
+    "dangerouslySetInnerHTML": ("dangerouslysetinnerhtml",),
+    "innerHTML assignment": (".innerhtml",),
+    "document.write": ("document.write",),
+    "SQL String Concat": ("select", "insert", "update", "delete"),
+    "SQL f-string": ("select", "insert", "update", "delete"),
+    "SSL Verify Disabled": ("verify",),
+    "Insecure flag": ("--insecure",),
+    "SSL Disabled": ("disable",),
+    "pickle usage": ("pickle.load",),
+    "Unsafe YAML load": ("yaml.load",),
+    # CONFIG_PATTERNS
+    "Debug mode enabled": ("debug",),
+    "Development mode in config": ("node_env",),
+    "CORS allow all origins": ("cors_allow_all",),
+    "CORS wildcard": ("access-control-allow-origin",),
+    "Dangerous CORS combo": ("allowcredentials",),
+}
+
+# Characters re.IGNORECASE matches to ASCII letters that str.lower() does not
+# lowercase to them; literal prefilters are skipped for text containing any.
+FOLD_EXCEPTIONS = ("\u0130", "\u0131", "\u017f")
+
+
+# ============================================================================
+#  COMPILED PATTERNS
+# ============================================================================
+
+def _line_bounded(pattern: str) -> str:
+    """Variant of pattern that can't match across lines: negated classes and \\s exclude \\n."""
+    return pattern.replace('[^', r'[^\n').replace(r'\s', r'[^\S\n]')
+
+
+def _compile(patterns: List[tuple], line_bounded: bool = False) -> List[tuple]:
+    """(regex, literals, *columns) for each (pattern, name, *rest) row."""
+    return [(re.compile(_line_bounded(pattern) if line_bounded else pattern, re.IGNORECASE),
+             PATTERN_LITERALS[name], name, *rest)
+            for pattern, name, *rest in patterns]
+
+
+SECRET_MATCHERS = _compile(SECRET_PATTERNS)
+# Matched against whole files, but reported per line
+DANGEROUS_MATCHERS = _compile(DANGEROUS_PATTERNS, line_bounded=True)
+CONFIG_MATCHERS = _compile(CONFIG_PATTERNS)
+
+NEWLINE_RE = re.compile("\n")
+
+# Below one literal hit per this many characters, regexes only run on the lines
+# holding a hit; denser files are matched as a whole buffer instead.
+DENSE_LITERAL_CHARS = 256
+
+
+@lru_cache(maxsize=4)
+def _lowered(content: str) -> Optional[str]:
+    """Lowercased content for literal prefilters, or None if they can't be trusted."""
+    if not content.isascii() and any(c in content for c in FOLD_EXCEPTIONS):
+        return None
+    return content.lower()
+
+
+def _candidates(matchers: List[tuple], lowered: Optional[str]) -> List[tuple]:
+    """Matchers whose literals occur in the lowered text (all if unknown)."""
+    if lowered is None:
+        return matchers
+    return [matcher for matcher in matchers if any(lit in lowered for lit in matcher[1])]
+
+
+class LineIndex:
+    """Maps offsets in a text to 0-based line numbers (bisect over its newline offsets)."""
+    __slots__ = ("_text", "_newlines")
+    
+    def __init__(self, text: str):
+        self._text = text
+        self._newlines = None
+    
+    @property
+    def newlines(self) -> array:
+        if self._newlines is None:
+            self._newlines = array('I', map(re.Match.start, NEWLINE_RE.finditer(self._text)))
+        return self._newlines
+    
+    def line_of(self, offset: int) -> int:
+        return bisect_right(self.newlines, offset)
+    
+    def span(self, line: int) -> Tuple[int, int]:
+        """(start, end) offsets of a line, excluding its newline."""
+        newlines = self.newlines
+        start = newlines[line - 1] + 1 if line else 0
+        end = newlines[line] if line < len(newlines) else len(self._text)
+        return start, end
+
+
+def _literal_lines(lowered: str, literal: str, index: LineIndex) -> List[int]:
+    """Lines of the lowered text that contain literal, in order."""
+    lines = []
+    offset = lowered.find(literal)
+    while offset != -1:
+        line = index.line_of(offset)
+        lines.append(line)
+        offset = lowered.find(literal, index.span(line)[1] + 1)
+    return lines
+
+
+# ============================================================================
+#  FILE WALKER
+# ============================================================================
+
+class FileScanner(NamedTuple):
+    """A content scanner driven by walk_project()."""
+    tool: str                                                  # results["tool"]; names the scanner in workers and the cache
+    fields: Tuple[str, ...]                                    # keys of each finding after "file", in order
+    accepts: Callable[[str, str], bool]                        # (file name, lowercase suffix)
+    start: Callable[[], Dict[str, Any]]                        # fresh results dict
+    scan_file: Callable[[str, Optional[str]], List[dict]]      # (relative path, content or None if unreadable) -> findings
+    add_file: Callable[[Dict[str, Any], List[dict]], None]     # fold one file's findings into results
+    finish: Callable[[Dict[str, Any], str], Dict[str, Any]]    # (results, project path)
+
+
+def walk_project(project_path: str, scanners: List[FileScanner], cache: Optional["ScanCache"] = None,
+                 since: Optional[str] = None, jobs: int = 1) -> List[Dict[str, Any]]:
+    """
+    Walk project_path once (or only the files changed since git ref `since`),
+    read each file at most once and hand its content to every scanner that
+    accepts it, on up to `jobs` worker processes. Findings of unchanged files
+    come from `cache` when given. Files are merged in path order, so results
+    don't depend on walk order or jobs. Returns one result per scanner.
+    """
+    runs = [(scanner, scanner.start()) for scanner in scanners]
+    if not runs:
+        return []
+    
+    # Per file: the scanners that want it, what the cache holds and the scan task, if any
+    files, tasks = [], []
+    walk = _project_files(project_path) if since is None else _changed_files(project_path, since)
+    for filepath, rel_path, file in walk:
+        ext = _suffix(file)
+        interested = [(scanner, results) for scanner, results in runs if scanner.accepts(file, ext)]
+        if not interested:
+            continue
+        
+        tools = tuple(scanner.tool for scanner, _ in interested)
+        stat, digest, cached, fresh = None, None, {}, False
+        if cache is not None:
+            try:
+                stat = os.stat(filepath)
+                digest, cached, fresh = cache.lookup(rel_path, stat)
+            except OSError:
+                stat = None
+        
+        if fresh:
+            # Size and mtime unchanged: only scanners missing from the cache run
+            missing = tuple(tool for tool in tools if tool not in cached)
+            task = (filepath, rel_path, missing, None, (), False) if missing else None
+        else:
+            task = (filepath, rel_path, tools, digest, tuple(cached), stat is not None)
+        files.append((rel_path, interested, stat, digest, cached, fresh, task))
+        if task is not None:
+            tasks.append(task)
+    
+    outcomes = iter(_run_tasks(tasks, jobs, {scanner.tool: scanner for scanner in scanners}))
+    merged = []
+    for rel_path, interested, stat, digest, cached, fresh, task in files:
+        if task is not None:
+            scanned_digest, outputs, ok = next(outcomes)
+            if not fresh:
+                if scanned_digest != digest:
+                    cached = {}  # content changed: every cached finding is stale
+                digest = scanned_digest
+            cached.update((tool, output) for tool, output in zip(task[2], outputs) if output is not None)
+            if cache is not None and ok and digest is not None:
+                cache.store(rel_path, stat, digest, cached)
+        merged.append((rel_path, interested, cached))
+    
+    merged.sort(key=lambda item: item[0])
+    for rel_path, interested, cached in merged:
+        for scanner, results in interested:
+            scanner.add_file(results, [{"file": rel_path, **dict(zip(scanner.fields, values))}
+                                       for values in cached[scanner.tool]])
+    
+    if cache is not None:
+        cache.save(prune=since is None)
+    return [scanner.finish(results, project_path) for scanner, results in runs]
+
+
+def _project_files(project_path: str):
+    """(path, relative path, file name) of every file outside SKIP_DIRS, in os.walk order."""
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        # Relative paths as Path.relative_to() spells them, built once per directory
+        rel_root = str(Path(root).relative_to(project_path))
+        prefix = "" if rel_root == "." else rel_root + os.sep
+        for file in files:
+            yield os.path.join(root, file), prefix + file, file
+
+
+def _changed_files(project_path: str, ref: str):
+    """(path, relative path, file name) of files changed since git ref (and untracked ones), sorted by path."""
+    for rel_path in changed_files(project_path, ref):
+        path = Path(project_path) / rel_path
+        if any(part in SKIP_DIRS for part in Path(rel_path).parts[:-1]) or not path.is_file():
+            continue  # skipped directory or deleted file
+        yield str(path), str(path.relative_to(project_path)), path.name
+
+
+def _suffix(name: str) -> str:
+    """Lowercase Path(name).suffix without building a Path."""
+    dot = name.rfind('.')
+    return name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+
+
+def changed_files(project_path: str, ref: str) -> List[str]:
+    """
+    Paths relative to project_path that differ from git ref (`git diff
+    --name-only`) or are untracked. Raises ValueError if git fails.
+    """
+    commands = [
+        ["git", "diff", "--name-only", "--relative", "-z", ref, "--"],
+        ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+    ]
+    paths = set()
+    for command in commands:
+        try:
+            result = subprocess.run(command, cwd=project_path, capture_output=True, text=True, check=True)
+        except FileNotFoundError:
+            raise ValueError("git not found; --since needs a git checkout")
+        except subprocess.CalledProcessError as e:
+            message = (e.stderr.strip().splitlines() or ["exit status %d" % e.returncode])[0]
+            raise ValueError(f"{' '.join(command[:2])} failed: {message}")
+        paths.update(path for path in result.stdout.split("\0") if path)
+    return sorted(paths)
+
+
+def default_jobs() -> int:
+    """CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _run_tasks(tasks: List[tuple], jobs: int, scanners: Dict[str, FileScanner]) -> List[tuple]:
+    """Outcomes of all tasks in order; batches of files go to a process pool when jobs > 1."""
+    # Workers look scanners up by tool name, so only registered scanners can run there
+    if (jobs <= 1 or len(tasks) < PARALLEL_MIN_FILES
+            or any(FILE_SCANNERS.get(tool) is not scanner for tool, scanner in scanners.items())):
+        return _scan_batch(tasks, scanners)
+    
+    # Several batches per worker keeps them busy when file sizes are uneven
+    size = max(1, min(BATCH_FILES, -(-len(tasks) // (jobs * 4))))
+    batches = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return [outcome for batch in pool.map(_scan_batch, batches) for outcome in batch]
+
+
+def _scan_batch(tasks: List[tuple], scanners: Optional[Dict[str, FileScanner]] = None) -> List[tuple]:
+    """
+    Scan (path, relative path, tools, cached digest, cached tools, hash?) tasks.
+    Returns (digest, outputs, ok) per task: one output per tool, either None
+    (the cached findings for that digest still hold) or compact findings, a
+    tuple of FileScanner.fields values each. ok is False if the file couldn't
+    be read or a scanner failed, so the result isn't cached.
+    """
+    scanners = scanners or FILE_SCANNERS
+    outcomes = []
+    for path, rel_path, tools, cached_digest, cached_tools, want_digest in tasks:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        except Exception:
+            content = None
+        ok = content is not None
+        digest = _digest(content) if want_digest and ok else None
+        
+        outputs = []
+        for tool in tools:
+            if digest is not None and digest == cached_digest and tool in cached_tools:
+                outputs.append(None)
+                continue
+            scanner = scanners[tool]
+            try:
+                findings = scanner.scan_file(rel_path, content)
+            except Exception:
+                findings, ok = [], False
+            outputs.append([tuple(finding[field] for field in scanner.fields) for finding in findings])
+        outcomes.append((digest, outputs, ok))
+    return outcomes
+
+
+# ============================================================================
+#  SCAN CACHE
+# ============================================================================
+
+CACHE_PATH = Path(".agent") / "cache" / "security_scan.sqlite"
+# Bump when findings change for the same pattern tables
+CACHE_FORMAT = 2
+# Files modified this close to the scan keep no mtime, so the next run re-hashes
+# them instead of trusting a timestamp that may not have ticked since.
+RACY_MTIME_NS = 2 * 10**9
+
+
+def _digest(content: str) -> str:
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _pattern_set_version() -> str:
+    """Fingerprint of everything that decides a file's findings."""
+    tables = (CACHE_FORMAT, SECRET_PATTERNS, DANGEROUS_PATTERNS, CONFIG_PATTERNS, sorted(PATTERN_LITERALS.items()))
+    return _digest(repr(tables))
+
+
+class ScanCache:
+    """
+    Per-file findings in <project>/.agent/cache/security_scan.sqlite, valid
+    while the file's size and mtime (or, failing those, its content hash)
+    and the pattern set are unchanged.
+    """
+    
+    def __init__(self, project_path: str):
+        self._project_path = Path(project_path)
+        db_path = self._project_path / CACHE_PATH
+        if not db_path.parent.is_dir():
+            db_path.parent.mkdir(parents=True)
+            # Keep the cache out of the scanned project's git status
+            (db_path.parent / ".gitignore").write_text("*\n", encoding="utf-8")
+        self._db = sqlite3.connect(str(db_path), timeout=10)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, "
+                         "mtime_ns INTEGER, digest TEXT, findings TEXT)")
+        
+        version = _pattern_set_version()
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'pattern_set'").fetchone()
+        if row is None or row[0] != version:
+            self._db.execute("DELETE FROM files")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('pattern_set', ?)", (version,))
+            self._db.commit()
+        
+        self._entries = {row[0]: row[1:] for row in self._db.execute("SELECT * FROM files")}
+        self._updates = {}
+        self._seen = set()
+        self._racy_after = time.time_ns() - RACY_MTIME_NS
+    
+    def lookup(self, rel_path: str, stat: os.stat_result) -> Tuple[Optional[str], Dict[str, list], bool]:
+        """
+        (content digest, compact findings by tool, whether size and mtime still
+        match) of a cached file; the findings are valid for that digest.
+        """
+        self._seen.add(rel_path)
+        entry = self._entries.get(rel_path)
+        if entry is None:
+            return None, {}, False
+        size, mtime_ns, digest, findings = entry
+        return digest, json.loads(findings), size == stat.st_size and mtime_ns == stat.st_mtime_ns
+    
+    def store(self, rel_path: str, stat: os.stat_result, digest: str, findings: Dict[str, list]):
+        mtime_ns = stat.st_mtime_ns if stat.st_mtime_ns < self._racy_after else -1
+        self._updates[rel_path] = (stat.st_size, mtime_ns, digest, json.dumps(findings, ensure_ascii=False))
+    
+    def save(self, prune: bool = True):
+        """Write new entries; with prune, drop entries of files that no longer exist."""
+        try:
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                                     [(path, *entry) for path, entry in self._updates.items()])
+                if prune:
+                    stale = [(path,) for path in self._entries
+                             if path not in self._seen and not (self._project_path / path).is_file()]
+                    self._db.executemany("DELETE FROM files WHERE path = ?", stale)
+        except sqlite3.Error as e:
+            print(f"security_scan: cache not saved: {e}", file=sys.stderr)
+        finally:
+            self._db.close()
 
 
 # ============================================================================
@@ -183,43 +604,44 @@ def scan_secrets(project_path: str) -> Dict[str, Any]:
     Validate no hardcoded secrets (OWASP A04).
     Checks: API keys, tokens, passwords, cloud credentials.
     """
-    results = {
+    return walk_project(project_path, [SECRET_SCANNER])[0]
+
+
+def _secrets_start() -> Dict[str, Any]:
+    return {
         "tool": "secret_scanner",
         "findings": [],
         "status": "[OK] No secrets detected",
         "scanned_files": 0,
         "by_severity": {"critical": 0, "high": 0, "medium": 0}
     }
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CODE_EXTENSIONS and ext not in CONFIG_EXTENSIONS:
-                continue
-                
-            filepath = Path(root) / file
-            results["scanned_files"] += 1
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                    for pattern, secret_type, severity in SECRET_PATTERNS:
-                        matches = re.findall(pattern, content, re.IGNORECASE)
-                        if matches:
-                            results["findings"].append({
-                                "file": str(filepath.relative_to(project_path)),
-                                "type": secret_type,
-                                "severity": severity,
-                                "count": len(matches)
-                            })
-                            results["by_severity"][severity] += len(matches)
-                            
-            except Exception:
-                pass
-    
+
+
+def _secrets_scan_file(rel_path: str, content: Optional[str]) -> List[dict]:
+    findings = []
+    if content is None:
+        return findings
+    
+    for regex, _, secret_type, severity in _candidates(SECRET_MATCHERS, _lowered(content)):
+        matches = regex.findall(content)
+        if matches:
+            findings.append({
+                "file": rel_path,
+                "type": secret_type,
+                "severity": severity,
+                "count": len(matches)
+            })
+    return findings
+
+
+def _secrets_add_file(results: Dict[str, Any], findings: List[dict]):
+    results["scanned_files"] += 1
+    results["findings"].extend(findings)
+    for finding in findings:
+        results["by_severity"][finding["severity"]] += finding["count"]
+
+
+def _secrets_finish(results: Dict[str, Any], project_path: str) -> Dict[str, Any]:
     if results["by_severity"]["critical"] > 0:
         results["status"] = "[!!] CRITICAL: Secrets exposed!"
     elif results["by_severity"]["high"] > 0:
@@ -233,50 +655,99 @@ def scan_secrets(project_path: str) -> Dict[str, Any]:
     return results
 
 
+SECRET_SCANNER = FileScanner(
+    tool="secret_scanner",
+    fields=("type", "severity", "count"),
+    accepts=lambda file, ext: ext in CODE_EXTENSIONS or ext in CONFIG_EXTENSIONS,
+    start=_secrets_start,
+    scan_file=_secrets_scan_file,
+    add_file=_secrets_add_file,
+    finish=_secrets_finish
+)
+
+
 def scan_code_patterns(project_path: str) -> Dict[str, Any]:
     """
     Validate dangerous code patterns (OWASP A05).
     Checks: Injection risks, XSS, unsafe deserialization.
     """
-    results = {
+    return walk_project(project_path, [PATTERN_SCANNER])[0]
+
+
+def _patterns_start() -> Dict[str, Any]:
+    return {
         "tool": "pattern_scanner",
         "findings": [],
         "status": "[OK] No dangerous patterns",
         "scanned_files": 0,
         "by_category": {}
     }
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CODE_EXTENSIONS:
+
+
+def _patterns_scan_file(rel_path: str, content: Optional[str]) -> List[dict]:
+    findings = []
+    if content is None:
+        return findings
+    
+    # (line, pattern index) for every line a pattern matches on. Lines are never
+    # split out: the regex runs in place on the buffer between pos and endpos.
+    lowered = _lowered(content)
+    index = LineIndex(content)
+    literal_counts, literal_lines = {}, {}
+    hits = []
+    for pattern_index, (regex, literals, *_) in enumerate(DANGEROUS_MATCHERS):
+        if lowered is not None:
+            for literal in literals:
+                if literal not in literal_counts:
+                    literal_counts[literal] = lowered.count(literal)
+            occurrences = sum(literal_counts[literal] for literal in literals)
+            if not occurrences:
                 continue
-                
-            filepath = Path(root) / file
-            results["scanned_files"] += 1
             
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    
-                    for line_num, line in enumerate(lines, 1):
-                        for pattern, name, severity, category in DANGEROUS_PATTERNS:
-                            if re.search(pattern, line, re.IGNORECASE):
-                                results["findings"].append({
-                                    "file": str(filepath.relative_to(project_path)),
-                                    "line": line_num,
-                                    "pattern": name,
-                                    "severity": severity,
-                                    "category": category,
-                                    "snippet": line.strip()[:80]
-                                })
-                                results["by_category"][category] = results["by_category"].get(category, 0) + 1
-                                
-            except Exception:
-                pass
-    
+            if occurrences * DENSE_LITERAL_CHARS < len(content):
+                # Sparse literals: only lines holding one of them can match
+                lines = set()
+                for literal in literals:
+                    if literal not in literal_lines:
+                        literal_lines[literal] = _literal_lines(lowered, literal, index)
+                    lines.update(literal_lines[literal])
+                for line in lines:
+                    start, end = index.span(line)
+                    if regex.search(content, start, end):
+                        hits.append((line, pattern_index))
+                continue
+        
+        # Match the whole buffer, resuming after each hit's line
+        match = regex.search(content)
+        while match:
+            line = index.line_of(match.start())
+            hits.append((line, pattern_index))
+            match = regex.search(content, index.span(line)[1] + 1)
+    hits.sort()
+    
+    for line, pattern_index in hits:
+        _, _, name, severity, category = DANGEROUS_MATCHERS[pattern_index]
+        start, end = index.span(line)
+        findings.append({
+            "file": rel_path,
+            "line": line + 1,
+            "pattern": name,
+            "severity": severity,
+            "category": category,
+            "snippet": content[start:end].strip()[:80]
+        })
+    return findings
+
+
+def _patterns_add_file(results: Dict[str, Any], findings: List[dict]):
+    results["scanned_files"] += 1
+    results["findings"].extend(findings)
+    for finding in findings:
+        category = finding["category"]
+        results["by_category"][category] = results["by_category"].get(category, 0) + 1
+
+
+def _patterns_finish(results: Dict[str, Any], project_path: str) -> Dict[str, Any]:
     critical_count = sum(1 for f in results["findings"] if f["severity"] == "critical")
     high_count = sum(1 for f in results["findings"] if f["severity"] == "high")
     
@@ -293,53 +764,54 @@ def scan_code_patterns(project_path: str) -> Dict[str, Any]:
     return results
 
 
+PATTERN_SCANNER = FileScanner(
+    tool="pattern_scanner",
+    fields=("line", "pattern", "severity", "category", "snippet"),
+    accepts=lambda file, ext: ext in CODE_EXTENSIONS,
+    start=_patterns_start,
+    scan_file=_patterns_scan_file,
+    add_file=_patterns_add_file,
+    finish=_patterns_finish
+)
+
+
 def scan_configuration(project_path: str) -> Dict[str, Any]:
     """
     Validate security configuration (OWASP A02).
     Checks: Security headers, CORS, debug modes.
     """
-    results = {
+    return walk_project(project_path, [CONFIG_SCANNER])[0]
+
+
+def _config_start() -> Dict[str, Any]:
+    return {
         "tool": "config_scanner",
         "findings": [],
         "status": "[OK] Configuration secure",
         "checks": {}
     }
-    
-    # Check common config files for issues
-    config_issues = [
-        (r'"DEBUG"\s*:\s*true', "Debug mode enabled", "high"),
-        (r'debug\s*=\s*True', "Debug mode enabled", "high"),
-        (r'NODE_ENV.*development', "Development mode in config", "medium"),
-        (r'"CORS_ALLOW_ALL".*true', "CORS allow all origins", "high"),
-        (r'"Access-Control-Allow-Origin".*\*', "CORS wildcard", "high"),
-        (r'allowCredentials.*true.*origin.*\*', "Dangerous CORS combo", "critical"),
-    ]
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CONFIG_EXTENSIONS and file not in ['next.config.js', 'webpack.config.js', '.eslintrc.js']:
-                continue
-                
-            filepath = Path(root) / file
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                    for pattern, issue, severity in config_issues:
-                        if re.search(pattern, content, re.IGNORECASE):
-                            results["findings"].append({
-                                "file": str(filepath.relative_to(project_path)),
-                                "issue": issue,
-                                "severity": severity
-                            })
-                            
-            except Exception:
-                pass
-    
+
+
+def _config_scan_file(rel_path: str, content: Optional[str]) -> List[dict]:
+    findings = []
+    if content is None:
+        return findings
+    
+    for regex, _, issue, severity in _candidates(CONFIG_MATCHERS, _lowered(content)):
+        if regex.search(content):
+            findings.append({
+                "file": rel_path,
+                "issue": issue,
+                "severity": severity
+            })
+    return findings
+
+
+def _config_add_file(results: Dict[str, Any], findings: List[dict]):
+    results["findings"].extend(findings)
+
+
+def _config_finish(results: Dict[str, Any], project_path: str) -> Dict[str, Any]:
     # Check for security header configurations
     header_files = ["next.config.js", "next.config.mjs", "middleware.ts", "nginx.conf"]
     for hf in header_files:
@@ -365,12 +837,32 @@ def scan_configuration(project_path: str) -> Dict[str, Any]:
     return results
 
 
+CONFIG_SCANNER = FileScanner(
+    tool="config_scanner",
+    fields=("issue", "severity"),
+    accepts=lambda file, ext: ext in CONFIG_EXTENSIONS or file in CONFIG_FILES,
+    start=_config_start,
+    scan_file=_config_scan_file,
+    add_file=_config_add_file,
+    finish=_config_finish
+)
+
+
+# Content scanners by tool name, as looked up in worker processes
+FILE_SCANNERS = {scanner.tool: scanner for scanner in (SECRET_SCANNER, PATTERN_SCANNER, CONFIG_SCANNER)}
+
+
 # ============================================================================
 #  MAIN
 # ============================================================================
 
-def run_full_scan(project_path: str, scan_type: str = "all") -> Dict[str, Any]:
-    """Execute security validation scans."""
+def run_full_scan(project_path: str, scan_type: str = "all", use_cache: bool = False,
+                  since: Optional[str] = None, jobs: int = 1) -> Dict[str, Any]:
+    """
+    Execute security validation scans. use_cache reuses per-file findings from
+    the project's scan cache; since limits content scans to files changed
+    since that git ref; jobs is the number of worker processes for them.
+    """
     
     report = {
         "project": project_path,
@@ -384,28 +876,44 @@ def run_full_scan(project_path: str, scan_type: str = "all") -> Dict[str, Any]:
             "overall_status": "[OK] SECURE"
         }
     }
+    if since is not None:
+        report["since"] = since
     
     scanners = {
         "deps": ("dependencies", scan_dependencies),
-        "secrets": ("secrets", scan_secrets),
-        "patterns": ("code_patterns", scan_code_patterns),
-        "config": ("configuration", scan_configuration),
+        "secrets": ("secrets", SECRET_SCANNER),
+        "patterns": ("code_patterns", PATTERN_SCANNER),
+        "config": ("configuration", CONFIG_SCANNER),
     }
+    selected = [(name, scanner) for key, (name, scanner) in scanners.items()
+                if scan_type == "all" or scan_type == key]
     
-    for key, (name, scanner) in scanners.items():
-        if scan_type == "all" or scan_type == key:
+    # Content scanners share a single walk of the project
+    file_scanners = [scanner for _, scanner in selected if isinstance(scanner, FileScanner)]
+    cache = None
+    if use_cache and file_scanners:
+        try:
+            cache = ScanCache(project_path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"security_scan: cache disabled: {e}", file=sys.stderr)
+    walked = dict(zip(map(id, file_scanners), walk_project(project_path, file_scanners, cache, since, jobs)))
+    
+    for name, scanner in selected:
+        if isinstance(scanner, FileScanner):
+            result = walked[id(scanner)]
+        else:
             result = scanner(project_path)
-            report["scans"][name] = result
-            
-            findings_count = len(result.get("findings", []))
-            report["summary"]["total_findings"] += findings_count
-            
-            for finding in result.get("findings", []):
-                sev = finding.get("severity", "low")
-                if sev == "critical":
-                    report["summary"]["critical"] += 1
-                elif sev == "high":
-                    report["summary"]["high"] += 1
+        report["scans"][name] = result
+        
+        findings_count = len(result.get("findings", []))
+        report["summary"]["total_findings"] += findings_count
+        
+        for finding in result.get("findings", []):
+            sev = finding.get("severity", "low")
+            if sev == "critical":
+                report["summary"]["critical"] += 1
+            elif sev == "high":
+                report["summary"]["high"] += 1
     
     # Determine overall status
     if report["summary"]["critical"] > 0:
@@ -427,6 +935,12 @@ def main():
                         default="all", help="Type of scan to run")
     parser.add_argument("--output", choices=["json", "summary"], default="json",
                         help="Output format")
+    parser.add_argument("--since", metavar="REF",
+                        help="Only scan files changed since this git ref (plus untracked files)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rescan every file instead of reusing cached findings")
+    parser.add_argument("--jobs", type=int, default=default_jobs(),
+                        help="Worker processes for file scanning (default: CPU count)")
     
     args = parser.parse_args()
     
@@ -434,7 +948,12 @@ def main():
         print(json.dumps({"error": f"Directory not found: {args.project_path}"}))
         sys.exit(1)
     
-    result = run_full_scan(args.project_path, args.scan_type)
+    try:
+        result = run_full_scan(args.project_path, args.scan_type, use_cache=not args.no_cache,
+                               since=args.since, jobs=max(1, args.jobs))
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}))
+        sys.exit(1)
     
     if args.output == "summary":
         print(f"\n{'='*60}")